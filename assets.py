@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Published Asset Names for ProteinCookies.com
+
+Static assets are published under content-hashed names so they can be
+cached as immutable. assets.json maps each asset's source path to the name
+it is published under, e.g.
+
+    css/styles.min.css     -> css/styles.3f9a1c2b7d.min.css
+    js/pack-picker.js      -> js/pack-picker.8e02a4b1c9.js
+    guides/x-pack.pdf      -> guides/x-pack.51c0e7d2aa.pdf
+
+publish_static() (the build's assets stage) publishes the JS, images and
+PDF guides; the stylesheet stage publishes its own output. The writer runs
+every .html output through rewrite(), so pages reference the hashed names
+whatever template or script produced them. The source files keep their
+plain names for links from outside the site.
+
+When an asset is republished its previous hashed copy is kept, since HTML
+cached before the change (max-age=3600) still links it; older copies are
+deleted. Only the sources and assets.json are committed: the deploy
+publishes the static assets again and restores the previous generation
+from the commit that was last deployed.
+
+Usage:
+    python assets.py                  # publish the static assets
+    python assets.py --previous REF   # also restore the copies assets.json named at git revision REF
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+
+ASSET_MANIFEST = 'assets.json'
+
+# Source assets published under hashed names, in order: JS last, so its
+# references to the others can be rewritten before it is hashed
+STATIC_ASSETS = ['images/*', 'recipe_images/*', 'guides/*.pdf', 'js/*.js']
+
+HASH_LENGTH = 10
+HASHED = re.compile(r'\.[0-9a-f]{%d}\.' % HASH_LENGTH)
+
+# A relative or site-absolute path in an attribute, CSS url() or JS string
+REFERENCE = re.compile(r'(?<![\w./-])(/?)([\w-]+(?:/[\w.-]+)*\.\w+)(?=["\'\s)?#,>]|$)')
+# Characters a reference never contains, so streamed text can be split there
+BOUNDARY = re.compile(r'["\'\s<>()][^"\'\s<>()]*$')
+
+_manifest = None
+
+
+def load():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(ASSET_MANIFEST, 'r') as f:
+                _manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def _save():
+    from writer import write_output
+
+    write_output(ASSET_MANIFEST, json.dumps(load(), indent=1, sort_keys=True) + '\n')
+
+
+def record(path, published):
+    """Remember that path is published as published and save the manifest"""
+    manifest = load()
+    if manifest.get(path) != published:
+        manifest[path] = published
+        _save()
+
+
+def url(path):
+    """Site-absolute URL of an asset, by its hashed name once one has been recorded"""
+    return '/' + load().get(path, path)
+
+
+def entries(paths):
+    """The manifest entries of paths, for build inputs of a page that references them"""
+    manifest = load()
+    return {path: manifest.get(path) for path in sorted(paths)}
+
+
+def fingerprint(path, content):
+    """path with a content hash before its extension(s): css/styles.min.css -> css/styles.<hash>.min.css"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition('.')
+    return os.path.join(directory, f'{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{dot}{extension}')
+
+
+def is_fingerprinted(path):
+    return bool(HASHED.search(os.path.basename(path)))
+
+
+def _remove_copies(path, keep=()):
+    """Delete hashed copies of path other than those in keep"""
+    directory, name = os.path.split(path)
+    stem, _, extension = name.partition('.')
+    for old in glob.glob(os.path.join(directory, f'{glob.escape(stem)}.*.{extension}')):
+        if old not in keep and is_fingerprinted(old) and old.count('.') == name.count('.') + 1:
+            os.remove(old)
+            print(f"Removed: {old}")
+
+
+def publish(path, content):
+    """Write content under its fingerprinted name, record it and drop copies before the previous one; return the published path"""
+    from writer import write_output
+
+    published = fingerprint(path, content)
+    previous = load().get(path)
+    write_output(published, content)
+    _remove_copies(path, keep={published, previous})
+    record(path, published)
+    return published
+
+
+def forget(path):
+    """Delete the hashed copies of path and drop it from the manifest"""
+    _remove_copies(path)
+    if load().pop(path, None) is not None:
+        _save()
+
+
+def rewrite(text, referenced=None, manifest=None):
+    """Point every reference to a published asset at its hashed name, adding its source path to referenced"""
+    manifest = load() if manifest is None else manifest
+    if not manifest:
+        return text
+
+    def replace(match):
+        published = manifest.get(match.group(2))
+        if not published:
+            return match.group()
+        if referenced is not None:
+            referenced.add(match.group(2))
+        return match.group(1) + published
+
+    return REFERENCE.sub(replace, text)
+
+
+def rewrite_stream(chunks, referenced=None):
+    """rewrite() for an iterable of str chunks; text after the last boundary waits for the next chunk"""
+    tail = ''
+    for chunk in chunks:
+        text = tail + chunk
+        match = BOUNDARY.search(text)
+        cut = match.start() + 1 if match else 0
+        if cut:
+            yield rewrite(text[:cut], referenced)
+        tail = text[cut:]
+    if tail:
+        yield rewrite(tail, referenced)
+
+
+def iter_static():
+    for pattern in STATIC_ASSETS:
+        for path in sorted(glob.glob(pattern)):
+            if os.path.isfile(path) and not is_fingerprinted(path) and not path.endswith(('.gz', '.br')):
+                yield path
+
+
+def publish_static():
+    """Publish every static asset under its content hash; return (published, unchanged) counts"""
+    manifest = load()
+    sources = list(iter_static())
+    published = unchanged = 0
+    for path in sources:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.js'):
+            data = rewrite(data.decode('utf-8')).encode('utf-8')
+        name = fingerprint(path, data)
+        if manifest.get(path) == name and os.path.exists(name):
+            unchanged += 1
+            continue
+        publish(path, data)
+        print(f"Published: {path} -> {name}")
+        published += 1
+
+    # Forget assets whose source is gone
+    for path in [p for p in manifest if p.startswith(tuple(os.path.dirname(s) + '/' for s in STATIC_ASSETS))]:
+        if path not in sources and not os.path.exists(path):
+            forget(path)
+            print(f"Removed: {path} from {ASSET_MANIFEST}")
+    return published, unchanged
+
+
+def _git_show(ref, path):
+    return subprocess.run(['git', 'show', f'{ref}:{path}'], capture_output=True, check=True).stdout
+
+
+def publish_previous(ref):
+    """Restore the hashed copies assets.json named at git revision ref that are no longer current; return their count"""
+    from writer import write_output
+
+    try:
+        previous = json.loads(_git_show(ref, ASSET_MANIFEST))
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        print(f"No {ASSET_MANIFEST} at {ref}; previous copies not restored")
+        return 0
+    restored = 0
+    for path, published in sorted(previous.items()):
+        if published == load().get(path) or os.path.exists(published):
+            continue
+        try:
+            data = _git_show(ref, path)
+        except subprocess.CalledProcessError:
+            continue
+        if path.endswith('.js'):
+            data = rewrite(data.decode('utf-8'), manifest=previous).encode('utf-8')
+        # The source may have been committed out of step with its hashed name
+        if fingerprint(path, data) != published:
+            continue
+        write_output(published, data)
+        print(f"Restored: {published}")
+        restored += 1
+    return restored
+
+
+def clear():
+    """Forget the loaded manifest so the next url() rereads assets.json (used by watch mode)"""
+    global _manifest
+    _manifest = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish the static assets under hashed names')
+    parser.add_argument('--previous', metavar='REF',
+                        help='also restore the hashed copies assets.json named at this git revision')
+    args = parser.parse_args()
+    published, unchanged = publish_static()
+    print(f"assets: {published} published, {unchanged} unchanged")
+    if args.previous:
+        print(f"assets: {publish_previous(args.previous)} restored from {args.previous}")
+
+
+if __name__ == '__main__':
+    main()
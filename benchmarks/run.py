@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness for ProteinCookies.com
+
+Builds the site from synthetic catalogs of 1k, 10k and 100k recipes in a
+scratch directory and times each stage: catalog load, recipe pages,
+category pages, pack pages, success pages, PDF packs and the scripts/ HTML
+rewriters run over the generated pages. Every stage runs in a fresh
+process, so peak RSS is per stage.
+
+Results are compared with benchmarks/baseline.json; a stage whose time per
+output grows, or whose peak RSS grows, by more than the tolerance is a
+regression and the harness exits non-zero. Time per output stays comparable
+when a change alters how many outputs a stage writes (e.g. pagination); the
+report notes such changes. Re-record the baseline in the change that moves
+these numbers on purpose.
+
+Usage:
+    python benchmarks/run.py                    # 1000, 10000, 100000 recipes
+    python benchmarks/run.py --sizes 1000 10000
+    python benchmarks/run.py --save-baseline    # record these results as the baseline
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Allowed slowdown / memory growth against the baseline before failing
+TOLERANCE = 0.25
+
+GENERATOR_STAGES = {
+    'pages': 'generate_pages',
+    'categories': 'generate_categories',
+    'packs': 'generate_packs',
+    'success': 'generate_success_pages',
+    'pdfs': 'generate_pdfs',
+}
+
+
+def _each_file(function):
+    return lambda module, directory, files: sum(bool(function(module, f)) for f in files)
+
+
+def _keyed_by_filename(table, function):
+    """For rewriters whose data is keyed by the real page filenames: give every synthetic page the first entry"""
+    def run(module, directory, files):
+        entries = getattr(module, table)
+        sample = next(iter(entries.values()))
+        for f in files:
+            entries.setdefault(os.path.basename(f), sample)
+        return _each_file(function)(module, directory, files)
+    return run
+
+
+# scripts/ module -> runs its rewrite over the generated pages
+REWRITERS = {
+    'add_breadcrumb_schema': _each_file(lambda m, f: m.add_breadcrumb_to_file(f, os.path.basename(f))),
+    'enhance_recipe_schema': _keyed_by_filename('RECIPE_RATINGS', lambda m, f: m.process_file(f, os.path.basename(f))),
+    'improve_internal_linking': _keyed_by_filename('LINKING_RULES', lambda m, f: m.process_file(f, os.path.basename(f))),
+    'replace_logos': lambda m, directory, files: m.replace_logos(directory),
+    'update_footer': _each_file(lambda m, f: m.update_footer_in_file(f)),
+    'update_html_images': _each_file(lambda m, f: m.process_html_file(f)),
+    'update_navigation': _each_file(lambda m, f: m.process_file(f)),
+}
+
+STAGES = ['catalog'] + list(GENERATOR_STAGES) + [f'rewrite:{name}' for name in REWRITERS]
+
+
+def _peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_stage(stage):
+    """Run one stage in the current directory and return (outputs, seconds)"""
+    sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, 'scripts')]
+
+    if stage == 'catalog':
+        from catalog import load_catalog
+        start = time.perf_counter()
+        catalog = load_catalog()
+        return len(catalog), time.perf_counter() - start
+
+    if stage in GENERATOR_STAGES:
+        # Importing a generator loads the (already cached) catalog; only rendering is timed
+        module = importlib.import_module(GENERATOR_STAGES[stage])
+        if stage == 'pages':
+            from catalog import load_catalog
+            targets = list(module.targets(load_catalog()))
+        else:
+            targets = list(module.targets())
+        start = time.perf_counter()
+        for filename, inputs, render in targets:
+            render()
+        return len(targets), time.perf_counter() - start
+
+    name = stage.split(':', 1)[1]
+    module = importlib.import_module(name)
+    directory = os.getcwd()
+    files = sorted(glob.glob(os.path.join(directory, '*.html')))
+    start = time.perf_counter()
+    REWRITERS[name](module, directory, files)
+    return len(files), time.perf_counter() - start
+
+
+def worker(stage, directory):
+    os.chdir(directory)
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        outputs, seconds = run_stage(stage)
+    print(json.dumps({'outputs': outputs, 'seconds': seconds, 'peak_rss': _peak_rss()}))
+
+
+def measure(stage, directory):
+    """Run a stage in a fresh interpreter; return its result dict, or None if it cannot run here"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', stage, directory],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()
+        print(f"  {stage}: skipped ({error[-1] if error else 'failed'})")
+        return None
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['pages_per_second'] = result['outputs'] / result['seconds'] if result['seconds'] else 0.0
+    result['ms_per_output'] = result['seconds'] * 1000 / result['outputs'] if result['outputs'] else 0.0
+    return result
+
+
+def run_size(size, seed=0):
+    from synthetic_catalog import write_catalog
+
+    directory = tempfile.mkdtemp(prefix=f'bench-{size}-')
+    try:
+        write_catalog(os.path.join(directory, 'data', 'recipes.json'), size, seed)
+        results = {}
+        for stage in STAGES:
+            result = measure(stage, directory)
+            if result is not None:
+                results[stage] = result
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    for size, stages in results.items():
+        baseline[size] = {stage: {'outputs': r['outputs'], 'ms_per_output': round(r['ms_per_output'], 4),
+                                  'pages_per_second': round(r['pages_per_second'], 1), 'peak_rss': r['peak_rss']}
+                          for stage, r in stages.items()}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def compare(result, base, tolerance=TOLERANCE):
+    """Return a list of regression messages for one stage"""
+    problems = []
+    if base is None:
+        return problems
+    if result['ms_per_output'] > base['ms_per_output'] * (1 + tolerance):
+        problems.append(f"{result['ms_per_output']:.3f} ms/output vs baseline {base['ms_per_output']:.3f}")
+    if result['peak_rss'] > base['peak_rss'] * (1 + tolerance):
+        problems.append(f"{result['peak_rss'] / 2 ** 20:.0f} MB RSS vs baseline {base['peak_rss'] / 2 ** 20:.0f}")
+    return problems
+
+
+def report(results, baseline, tolerance=TOLERANCE):
+    """Print a results table and return the number of regressions"""
+    regressions = 0
+    for size, stages in results.items():
+        print(f"\n{size} recipes")
+        print(f"{'stage':<34} {'outputs':>8} {'seconds':>9} {'pages/s':>10} {'ms/output':>10} {'RSS MB':>8}"
+              f"  time/output vs baseline")
+        for stage, r in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if base is not None and 'ms_per_output' not in base:
+                # Recorded before time per output was, so not comparable
+                base = None
+            if base is None:
+                status = 'no baseline'
+            else:
+                change = r['ms_per_output'] / base['ms_per_output'] - 1 if base['ms_per_output'] else 0.0
+                status = f'{change:+.0%}'
+            problems = compare(r, base, tolerance)
+            if problems:
+                regressions += 1
+                status = 'REGRESSION: ' + '; '.join(problems)
+            if base is not None and r['outputs'] != base['outputs']:
+                status += f" ({r['outputs']} outputs vs baseline {base['outputs']})"
+            print(f"{stage:<34} {r['outputs']:>8} {r['seconds']:>9.3f} {r['pages_per_second']:>10.0f} "
+                  f"{r['ms_per_output']:>10.3f} {r['peak_rss'] / 2 ** 20:>8.1f}  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ProteinCookies.com build on synthetic catalogs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, metavar='N')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--json', metavar='FILE', help='also write the raw results as JSON')
+    parser.add_argument('--worker', nargs=2, metavar=('STAGE', 'DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(*args.worker)
+
+    results = {}
+    for size in args.sizes:
+        print(f"Benchmarking {size} recipes...")
+        results[str(size)] = run_size(size, args.seed)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    regressions = report(results, load_baseline(), args.tolerance)
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+    elif regressions:
+        sys.exit(f"\n{regressions} stage(s) regressed beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Synthetic Recipe Catalog Generator for ProteinCookies.com benchmarks
+
+Writes a recipes.json with the same schema as data/recipes.json at any size.
+The real recipes come first so pack and category definitions still resolve;
+the rest are built deterministically from the real tags, methods,
+ingredients, instructions and images.
+
+Usage:
+    python benchmarks/synthetic_catalog.py 10000 [-o data/synthetic.json] [--seed 0]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from catalog import iter_recipes
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SOURCE_PATH = os.path.join(REPO_ROOT, 'data', 'recipes.json')
+
+FLAVORS = [
+    'Chocolate Chip', 'Peanut Butter', 'Double Chocolate', 'Oatmeal Raisin', 'Snickerdoodle',
+    'Birthday Cake', 'White Chocolate Macadamia', 'Pumpkin Spice', 'Lemon', 'Red Velvet',
+    'Gingerbread', 'Banana', 'Almond Joy', 'Salted Caramel', 'Cookies and Cream', 'Espresso',
+    'Blueberry', 'Coconut', 'Cinnamon Roll', 'Mint Chocolate', 'Maple Pecan', 'Strawberry',
+]
+STYLES = ['Protein Cookies', 'Protein Cookie Bites', 'Soft Protein Cookies', 'Crispy Protein Cookies',
+          'Skillet Protein Cookie', 'Protein Cookie Bars', 'Stuffed Protein Cookies']
+
+
+class Vocabulary:
+    """Value pools collected from the real catalog"""
+
+    def __init__(self, recipes):
+        self.categories = sorted({r['category'] for r in recipes})
+        self.difficulties = sorted({r['difficulty'] for r in recipes})
+        self.tags = sorted({t for r in recipes for t in r['tags']})
+        self.methods = sorted({m for r in recipes for m in r.get('methods', [])})
+        self.ingredients = sorted({i for r in recipes for i in r['ingredients']})
+        self.steps = [s for r in recipes for s in r['instructions']]
+        self.images = sorted({r['image'] for r in recipes})
+        self.servings = sorted({(r['servingSize'], r['yield']) for r in recipes})
+
+
+def synthetic_recipe(rng, vocab, recipe_id):
+    """Build one realistic, schema-complete recipe"""
+    flavor = rng.choice(FLAVORS)
+    style = rng.choice(STYLES)
+    title = f'{flavor} {style}'
+    slug = f"{title.lower().replace(' ', '-')}-{recipe_id}"
+
+    protein = rng.randint(8, 32)
+    carbs = rng.randint(4, 24)
+    fat = rng.randint(2, 12)
+    prep = rng.randint(5, 20)
+    cook = rng.choice([0, 8, 10, 12, 14, 18])
+    serving, yield_ = rng.choice(vocab.servings)
+
+    steps = rng.sample(vocab.steps, rng.randint(4, 7))
+    return {
+        'id': recipe_id,
+        'slug': slug,
+        'title': title,
+        'description': (f'{flavor} flavor in a macro-friendly {style.lower()} recipe with '
+                        f'{protein}g protein per serving. Simple ingredients, big results.'),
+        'protein': protein,
+        'calories': protein * 4 + carbs * 4 + fat * 9,
+        'carbs': carbs,
+        'fat': fat,
+        'fiber': rng.randint(0, 6),
+        'sugar': rng.randint(0, carbs // 2),
+        'servingSize': serving,
+        'yield': yield_,
+        'prepTime': str(prep),
+        'cookTime': str(cook),
+        'totalTime': str(prep + cook),
+        'difficulty': rng.choice(vocab.difficulties),
+        'category': rng.choice(vocab.categories),
+        'tags': rng.sample(vocab.tags, 3),
+        'methods': rng.sample(vocab.methods, rng.randint(1, 2)),
+        'image': rng.choice(vocab.images),
+        'ingredients': rng.sample(vocab.ingredients, rng.randint(5, 11)),
+        'instructions': [dict(s) for s in steps],
+    }
+
+
+def synthetic_catalog(count, seed=0, source=SOURCE_PATH):
+    """Return count recipes: the real catalog followed by synthetic ones"""
+    real = list(iter_recipes(source))
+    vocab = Vocabulary(real)
+    rng = random.Random(seed)
+    recipes = real[:count]
+    for recipe_id in range(len(recipes) + 1, count + 1):
+        recipes.append(synthetic_recipe(rng, vocab, recipe_id))
+    return recipes
+
+
+def write_catalog(path, count, seed=0):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'recipes': synthetic_catalog(count, seed)}, f, indent=1)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic recipes.json for benchmarks')
+    parser.add_argument('count', type=int, help='number of recipes')
+    parser.add_argument('-o', '--output', default='data/synthetic.json')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_catalog(args.output, args.count, args.seed)
+    print(f'Wrote {args.count} recipes to {args.output}')
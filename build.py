@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Build ProteinCookies.com in a single process
+
+Runs the page, category, pack, success page and PDF generators as stages of
+one dependency graph, sharing the recipe catalog between them, and reports
+wall time per stage.
+
+Builds are incremental: .build-manifest.json maps every output file to the
+hashes of its inputs (recipe data, template source, category or pack
+definition, generator version) and only outputs whose inputs changed are
+rendered again.
+
+Usage:
+    python build.py              # build everything that changed (all but release stages)
+    python build.py pages packs  # selected stages plus their dependencies
+    python build.py --force      # rebuild every output
+    python build.py --jobs 0     # render in parallel, one worker per core
+    python build.py --profile    # also write build-profile.json
+    python build.py --minify     # minify HTML as it is written
+    python build.py css          # just the Tailwind stylesheet
+    python build.py critical     # above-the-fold CSS inlined into each page type
+    python build.py assets       # publish JS, images and guides under hashed names
+    python build.py fonts        # subset the vendored fonts in fonts/src/
+    python build.py bundles      # per-page-type JS bundles of the js/ scripts pages use
+    python build.py compress     # release: .gz/.br siblings of the published files
+
+The css stage compiles the Tailwind stylesheet the pages link to and the
+critical stage the above-the-fold CSS they inline (see critical.py); both
+need the Tailwind CLI (see stylesheet.py).
+"""
+
+import argparse
+import cProfile
+import json
+import multiprocessing
+import os
+import time
+import tracemalloc
+
+import assets
+import writer
+from catalog import load_catalog, record_hash
+from minify import MINIFIER_VERSION
+
+MANIFEST_PATH = '.build-manifest.json'
+PROFILE_PATH = 'build-profile.json'
+
+# Outputs listed in the profile summary
+SLOWEST_OUTPUTS = 20
+
+# Rough peak memory of one render worker, used to cap the pool size
+WORKER_MEMORY = 128 * 1024 * 1024
+
+# Render callables for the current parallel batch; forked workers inherit them
+_pending = []
+
+
+def stage_catalog():
+    catalog = load_catalog()
+    print(f"Loaded {len(catalog)} recipes")
+
+
+def stage_fonts():
+    import fonts
+    return fonts.targets()
+
+
+def stage_css():
+    import stylesheet
+    return stylesheet.targets()
+
+
+def stage_critical():
+    import critical
+    return critical.targets()
+
+
+def stage_assets():
+    published, unchanged = assets.publish_static()
+    print(f"assets: {published} published, {unchanged} unchanged")
+
+
+def stage_bundles():
+    import bundles
+    return bundles.targets()
+
+
+def stage_pages():
+    import generate_pages
+    return generate_pages.targets(load_catalog())
+
+
+def stage_categories():
+    import generate_categories
+    return generate_categories.targets()
+
+
+def cleanup_categories():
+    import generate_categories
+    return generate_categories.remove_stale_pages()
+
+
+def stage_packs():
+    import generate_packs
+    return generate_packs.targets()
+
+
+def stage_success():
+    import generate_success_pages
+    return generate_success_pages.targets()
+
+
+def stage_pdfs():
+    import generate_pdfs
+    return generate_pdfs.targets()
+
+
+def stage_compress():
+    import compress
+    return compress.targets()
+
+
+def cleanup_compress():
+    import compress
+    return compress.remove_stale_siblings()
+
+
+# Stage name -> (dependencies, function)
+STAGES = {
+    'catalog': ([], stage_catalog),
+    'fonts': ([], stage_fonts),
+    'css': ([], stage_css),
+    'critical': ([], stage_critical),
+    'pdfs': (['catalog'], stage_pdfs),
+    'assets': (['pdfs'], stage_assets),
+    'bundles': (['assets'], stage_bundles),
+    'pages': (['catalog', 'fonts', 'css', 'critical', 'assets', 'bundles'], stage_pages),
+    'categories': (['catalog', 'fonts', 'css', 'critical', 'assets', 'bundles'], stage_categories),
+    'packs': (['catalog', 'fonts', 'css', 'critical', 'assets', 'bundles'], stage_packs),
+    'success': (['fonts', 'css', 'critical', 'assets', 'bundles'], stage_success),
+    'compress': (['pages', 'categories', 'packs', 'success', 'pdfs'], stage_compress),
+}
+
+# Stage name -> function run after its targets render; it deletes outputs the
+# stage no longer produces and returns their filenames
+CLEANUPS = {
+    'categories': cleanup_categories,
+    'compress': cleanup_compress,
+}
+
+# Stages a plain build leaves out; they run only when named (for a release)
+RELEASE_STAGES = {'compress'}
+
+# Stages that are pure CPU work on independent files; they render in a pool even without --jobs
+POOLED_STAGES = {'compress'}
+
+# Stages whose renders record hashed names in assets.json; they stay in this process
+SERIAL_STAGES = {'fonts', 'css', 'bundles'}
+
+
+def resolve(names):
+    """Return the stages to run, dependencies first, in STAGES order"""
+    for name in names:
+        if name not in STAGES:
+            raise SystemExit(f"Unknown stage: {name} (choose from {', '.join(STAGES)})")
+
+    order = []
+
+    def visit(name, path):
+        if name in order:
+            return
+        if name in path:
+            raise SystemExit(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+        for dep in STAGES[name][0]:
+            visit(dep, path + [name])
+        order.append(name)
+
+    for name in STAGES:
+        if name in names:
+            visit(name, [])
+    return order
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _available_memory():
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def worker_count(requested=0):
+    """Number of render workers: the request (0 = all cores), capped by cores and free memory"""
+    if hasattr(os, 'sched_getaffinity'):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    jobs = min(requested, cores) if requested > 0 else cores
+    memory = _available_memory()
+    if memory is not None:
+        jobs = min(jobs, memory // WORKER_MEMORY)
+    return max(1, jobs)
+
+
+def _measure(render):
+    """Run one render and return its wall, CPU and write seconds and peak traced memory"""
+    written = writer.stats['seconds']
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    render()
+    return {
+        'wall': time.perf_counter() - wall,
+        'cpu': time.process_time() - cpu,
+        'write': writer.stats['seconds'] - written,
+        'peak_memory': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+    }
+
+
+def _render(index):
+    # Report this render's write counts, asset references and timing back to the parent process
+    writer.reset_stats()
+    measurement = _measure(_pending[index][1])
+    return index, dict(writer.stats), dict(writer.references), measurement
+
+
+def _render_serial(stale, profile=None):
+    """Render stale targets in this process, yielding (filename, hashes, timing)"""
+    if profile is not None:
+        # _measure() resets the traced peak for each render; keep the stage's peak so far
+        profile.record_peak()
+    for filename, hashes, render in stale:
+        measurement = _measure(render)
+        if profile is not None and measurement['peak_memory'] is not None:
+            profile.record_peak(measurement['peak_memory'])
+        yield filename, hashes, measurement
+
+
+def _render_parallel(stale, jobs):
+    """Render stale targets in a forked pool, yielding (filename, hashes, timing) as each finishes
+
+    Workers are forked after the catalog and templates are loaded, so they
+    share that memory copy-on-write instead of loading it again.
+    """
+    _pending[:] = [(filename, render) for filename, hashes, render in stale]
+    try:
+        with multiprocessing.get_context('fork').Pool(jobs) as pool:
+            chunksize = max(1, len(stale) // (jobs * 8))
+            for index, counts, references, measurement in pool.imap_unordered(_render, range(len(stale)), chunksize):
+                writer.add_stats(counts)
+                writer.references.update(references)
+                yield stale[index][0], stale[index][1], measurement
+    finally:
+        _pending.clear()
+
+
+def run_targets(targets, manifest, force=False, jobs=1, profile=None):
+    """Render the targets whose input hashes changed; return (rebuilt, up to date) counts"""
+    stale = []
+    fresh = 0
+    for filename, inputs, render in targets:
+        if writer.minify and filename.endswith('.html'):
+            inputs = dict(inputs, minify=MINIFIER_VERSION)
+        hashes = {name: record_hash(value) for name, value in inputs.items()}
+        if filename.endswith('.html'):
+            # Pages are rewritten to the current hashed asset names as they are
+            # written, so each depends on the entries it referenced last time
+            hashes['assets'] = assets.entries(manifest.get(filename, {}).get('assets', ()))
+        if not force and manifest.get(filename) == hashes and os.path.exists(filename):
+            fresh += 1
+        else:
+            stale.append((filename, hashes, render))
+
+    if jobs > 1 and len(stale) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        rendered = _render_parallel(stale, min(jobs, len(stale)))
+    else:
+        rendered = _render_serial(stale, profile)
+    for filename, hashes, measurement in rendered:
+        if filename in writer.references:
+            hashes = dict(hashes, assets=assets.entries(writer.references[filename]))
+        manifest[filename] = hashes
+        if profile is not None:
+            profile.add_output(filename, measurement)
+    return len(stale), fresh
+
+
+class BuildProfile:
+    """Wall time, CPU time and peak traced memory per stage and per output file
+
+    Render time is split into rendering and writing (writer.write_output).
+    With --jobs, output timings and memory come from the workers, while the
+    stage CPU time and peak memory cover the parent process only.
+    """
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self.stages = {}
+        self.outputs = {}
+        self._stage = None
+        tracemalloc.start()
+
+    def begin_stage(self, name):
+        self._stage = name
+        self._start = (time.perf_counter(), time.process_time())
+        self._peak = 0
+        tracemalloc.reset_peak()
+
+    def record_peak(self, peak=None):
+        """Fold a peak (default: the traced peak so far) into the current stage's"""
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1] if peak is None else peak)
+
+    def end_stage(self):
+        wall, cpu = self._start
+        outputs = [o for o in self.outputs.values() if o['stage'] == self._stage]
+        write = sum(o['write'] for o in outputs)
+        self.stages[self._stage] = {
+            'wall': time.perf_counter() - wall,
+            'cpu': time.process_time() - cpu,
+            'render': sum(o['wall'] for o in outputs) - write,
+            'write': write,
+            'outputs': len(outputs),
+            'peak_memory': max(self._peak, tracemalloc.get_traced_memory()[1]),
+        }
+
+    def add_output(self, filename, measurement):
+        self.outputs[filename] = dict(measurement, stage=self._stage)
+
+    def slowest(self, count=SLOWEST_OUTPUTS):
+        ranked = sorted(self.outputs.items(), key=lambda item: item[1]['wall'], reverse=True)
+        return [dict(output, file=filename) for filename, output in ranked[:count]]
+
+    def report(self):
+        return {
+            'jobs': self.jobs,
+            'wall': sum(s['wall'] for s in self.stages.values()),
+            'cpu': sum(s['cpu'] for s in self.stages.values()),
+            'peak_memory': max((s['peak_memory'] for s in self.stages.values()), default=0),
+            'stages': self.stages,
+            'outputs': self.outputs,
+            'slowest': self.slowest(),
+        }
+
+    def save(self, path=PROFILE_PATH):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+    def print_report(self):
+        print(f"\n{'stage':<12} {'wall ms':>10} {'cpu ms':>10} {'render ms':>10} {'write ms':>10} {'peak MB':>8}")
+        for name, s in self.stages.items():
+            print(f"{name:<12} {s['wall'] * 1000:10.1f} {s['cpu'] * 1000:10.1f} {s['render'] * 1000:10.1f} "
+                  f"{s['write'] * 1000:10.1f} {s['peak_memory'] / 2 ** 20:8.1f}")
+        print(f"\nSlowest {SLOWEST_OUTPUTS} outputs:")
+        for output in self.slowest():
+            print(f"{output['wall'] * 1000:10.1f} ms  {output['file']}")
+
+
+def build(names=None, force=False, jobs=1, profile=None, dependencies=True):
+    """Run the named stages (default: all but RELEASE_STAGES) and return {stage: seconds}
+
+    With dependencies=False only the named stages run, in STAGES order; the
+    caller knows their dependencies are up to date (watch mode).
+    """
+    manifest = load_manifest()
+    timings = {}
+    names = names or [name for name in STAGES if name not in RELEASE_STAGES]
+    for name in resolve(names) if dependencies else [name for name in STAGES if name in names]:
+        print(f"\n=== {name} ===")
+        start = time.perf_counter()
+        writer.reset_stats()
+        if profile is not None:
+            profile.begin_stage(name)
+        targets = STAGES[name][1]()
+        if targets is not None:
+            stage_jobs = worker_count() if name in POOLED_STAGES and jobs == 1 else jobs
+            if name in SERIAL_STAGES:
+                stage_jobs = 1
+            rebuilt, fresh = run_targets(targets, manifest, force, stage_jobs, profile)
+            print(f"{name}: {rebuilt} rebuilt, {fresh} up to date ({writer.summary()})")
+            if name in CLEANUPS:
+                for filename in CLEANUPS[name]():
+                    manifest.pop(filename, None)
+            # Save after every stage so a failed build keeps finished work
+            save_manifest(manifest)
+        if profile is not None:
+            profile.end_stage()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def print_timings(timings, total):
+    print("\n" + "=" * 40)
+    for name, seconds in timings.items():
+        print(f"{name:<12} {seconds * 1000:10.1f} ms")
+    print("-" * 40)
+    print(f"{'total':<12} {total * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build ProteinCookies.com')
+    parser.add_argument('stages', nargs='*', help=f"stages to run ({', '.join(STAGES)})")
+    parser.add_argument('--force', action='store_true', help='rebuild every output')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='render with N worker processes (0 = one per core)')
+    parser.add_argument('--minify', action='store_true', help='minify HTML outputs (also MINIFY_HTML=1)')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='REPORT',
+                        help=f'write per-stage and per-output timing and memory as JSON (default {PROFILE_PATH})')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='dump cProfile stats of the build process (for snakeviz, flameprof, pstats)')
+    args = parser.parse_args()
+
+    jobs = worker_count(args.jobs) if args.jobs != 1 else 1
+    writer.minify = writer.minify or args.minify
+    profile = BuildProfile(jobs) if args.profile else None
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    timings = build(args.stages, args.force, jobs, profile)
+    total = time.perf_counter() - start
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"\ncProfile stats written to {args.cprofile}")
+    if profile:
+        profile.print_report()
+        profile.save(args.profile)
+        print(f"\nProfile written to {args.profile}")
+    print_timings(timings, total)
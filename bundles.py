@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Per-page JavaScript Bundles for ProteinCookies.com
+
+Works out which of the scripts in js/ each generated page type (recipe,
+category, pack, success) uses, and publishes one deferred bundle per page
+type under a content-hashed name (see assets.py):
+
+1. A script is needed when a global it defines is used from the page's
+   markup: in an Alpine or event handler attribute (x-data="recipeSubstitution(...)"),
+   an inline script, or as a data- attribute for widgets that mount
+   themselves. The templates, the partials rendered into the page and its
+   generator are searched. Scripts it relies on are pulled in ahead of it.
+2. Needed scripts are concatenated in dependency order, each wrapped in
+   its own function scope so their top-level names cannot collide. The
+   sources in js/ are committed minified, so they are not minified again.
+3. Rarely used widgets (the pack picker) are not bundled: the bundle gets
+   a small loader that fetches the widget's hashed file on the visitor's
+   first interaction with the page.
+
+Pages link their bundle with <script defer> in the head; a page type that
+needs no scripts gets no bundle and no script tag.
+
+Usage:
+    python bundles.py
+"""
+
+import hashlib
+import os
+import re
+from functools import partial
+
+import assets
+from critical import PAGES, SOURCE_DIR
+from templating import TEMPLATE_DIR, get_template
+from writer import write_output
+
+# Bump to force every bundle to be rebuilt
+GENERATOR_VERSION = 1
+
+OUTPUT_DIR = 'js/bundles'
+
+# script -> (globals whose use means a page needs it, scripts it needs first, load on first interaction)
+SCRIPTS = {
+    'js/ingredients-data.js': (['INGREDIENTS', 'SUBSTITUTION_GROUPS'], [], False),
+    'js/recipe-substitution.js': (['recipeSubstitution'], ['js/ingredients-data.js'], False),
+    'js/recipe-recommendations.js': (['recipeRecommendations', 'getRandomRecipes', 'RECIPE_DATABASE'], [], False),
+    'js/email-signup.js': (['emailForm', 'EmailSignup'], [], False),
+    # Mounts itself; a page opts in with a data-pack-picker attribute
+    'js/pack-picker.js': (['data-pack-picker'], [], True),
+}
+
+# Where markup uses JavaScript: Alpine and event handler attribute values, inline scripts, data- attributes
+JS_ATTRIBUTE = re.compile(r'\s(?:x-[\w.:-]+|@[\w.:-]+|:[\w.-]+|on\w+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+INLINE_SCRIPT = re.compile(r'<script\b(?![^>]*\bsrc=|[^>]*application/ld\+json)[^>]*>(.*?)</script>', re.DOTALL)
+DATA_ATTRIBUTE = re.compile(r'\s(data-[\w-]+)')
+
+# Fetches the lazy scripts once, on whichever interaction comes first
+LAZY_LOADER = '''(function(){var events=['pointerdown','keydown','touchstart','scroll'];function load(){events.forEach(function(e){removeEventListener(e,load)});%s.forEach(function(src){var s=document.createElement('script');s.src=src;document.body.appendChild(s)})}events.forEach(function(e){addEventListener(e,load,{once:true,passive:true})})})();'''
+
+# page -> script tag, worked out once per build
+_tags = {}
+
+
+def output_path(page):
+    return f'{OUTPUT_DIR}/{page}.js'
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def page_sources(page):
+    """Everything a page type is rendered from: its templates, the partials rendered into it and its generator"""
+    template, generator, partials = PAGES[page]
+    names = sorted(set(get_template(template).dependencies) | set(partials))
+    return '\n'.join([_read(os.path.join(TEMPLATE_DIR, name)) for name in names] + [_read(os.path.join(SOURCE_DIR, generator))])
+
+
+def script_usage(text):
+    """The parts of markup that can reference scripts: handler code, inline scripts and data- attribute names"""
+    code = [double or single for double, single in JS_ATTRIBUTE.findall(text)]
+    code += INLINE_SCRIPT.findall(text)
+    code += DATA_ATTRIBUTE.findall(text)
+    return '\n'.join(code)
+
+
+def needed_scripts(page):
+    """Scripts a page type uses, dependencies first"""
+    text = script_usage(page_sources(page))
+    order = []
+
+    def add(path):
+        if path not in order:
+            for dependency in SCRIPTS[path][1]:
+                add(dependency)
+            order.append(path)
+
+    for path, (names, _, _) in SCRIPTS.items():
+        if any(re.search(r'(?<![\w-])%s(?![\w-])' % re.escape(name), text) for name in names):
+            add(path)
+    return order
+
+
+def bundle(scripts):
+    """Source of a bundle: eager scripts in their own scopes, then a loader for the lazy ones"""
+    parts = []
+    lazy = []
+    for path in scripts:
+        if SCRIPTS[path][2]:
+            lazy.append(assets.url(path))
+        else:
+            parts.append(f'/* {path} */\n(function(){{\n{assets.rewrite(_read(path)).strip()}\n}})();')
+    if lazy:
+        parts.append(LAZY_LOADER % ('[' + ','.join(f"'{src}'" for src in lazy) + ']'))
+    return '\n'.join(parts) + '\n'
+
+
+def build_bundle(page, source, scripts):
+    path = output_path(page)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    write_output(path, source)
+    published = assets.publish(path, source)
+    print(f"Generated: {published} ({len(source.encode('utf-8')):,} bytes, {', '.join(scripts)})")
+    return published
+
+
+def remove_bundle(page):
+    """Delete the bundle of a page type that no longer needs one"""
+    path = output_path(page)
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"Removed: {path}")
+    if path in assets.load():
+        assets.forget(path)
+
+
+def script_tags(page):
+    """Head markup that loads a page type's bundle, or nothing when it needs no scripts"""
+    if page not in _tags:
+        _tags[page] = ''
+        if needed_scripts(page) and output_path(page) in assets.load():
+            _tags[page] = f'\n    <script defer src="{assets.url(output_path(page))}"></script>'
+    return _tags[page]
+
+
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each page type that needs scripts"""
+    _tags.clear()
+    for page in PAGES:
+        scripts = needed_scripts(page)
+        if not scripts:
+            remove_bundle(page)
+            continue
+        source = bundle(scripts)
+        inputs = {'version': GENERATOR_VERSION, 'source': hashlib.sha256(source.encode()).hexdigest()}
+        yield output_path(page), inputs, partial(build_bundle, page, source, scripts)
+
+
+def clear():
+    """Forget the worked-out script tags so the next script_tags() looks again (used by watch mode)"""
+    _tags.clear()
+
+
+def main():
+    for page in PAGES:
+        scripts = needed_scripts(page)
+        if scripts:
+            build_bundle(page, bundle(scripts), scripts)
+        else:
+            remove_bundle(page)
+            print(f"{page}: no scripts needed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Recipe Catalog for ProteinCookies.com
+Loads data/recipes.json once and indexes it for the page generators
+
+The catalog can also live in data/recipes/ as one <slug>.json file per recipe
+plus a manifest of content hashes. Split the monolithic file with:
+
+    python catalog.py split [data/recipes.json] [data/recipes]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+from array import array
+
+SHARDS_DIR = 'data/recipes'
+MANIFEST_NAME = 'manifest.json'
+
+# Prefer the sharded layout once it exists
+if os.path.exists(os.path.join(SHARDS_DIR, MANIFEST_NAME)):
+    RECIPES_PATH = SHARDS_DIR
+else:
+    RECIPES_PATH = 'data/recipes.json'
+
+# Bump when the Catalog layout changes so old caches are rebuilt
+CACHE_VERSION = 3
+
+# Catalog backend: 'json' (in-memory indexes) or 'sqlite' (see recipe_store.py)
+RECIPE_STORE = os.environ.get('RECIPE_STORE', 'json')
+
+# Bytes read per chunk when streaming the catalog
+CHUNK_SIZE = 1 << 16
+
+# Catalogs already loaded in this process, keyed by source path
+_loaded = {}
+
+# Numeric recipe fields kept as columns
+NUTRITION_FIELDS = ('protein', 'calories', 'carbs', 'fat', 'fiber', 'sugar')
+TIME_FIELDS = ('prepTime', 'cookTime', 'totalTime')
+COLUMN_FIELDS = NUTRITION_FIELDS + TIME_FIELDS
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def record_hash(recipe):
+    """Content hash of a single recipe record (or any JSON value)"""
+    return _sha256(json.dumps(recipe, sort_keys=True).encode())
+
+
+# Recipe fields shown on listing cards (category and pack pages)
+CARD_FIELDS = ('slug', 'title', 'image', 'protein', 'calories', 'totalTime')
+
+
+def card_hash(recipe):
+    """Content hash of the fields a recipe card displays"""
+    return record_hash({field: recipe[field] for field in CARD_FIELDS})
+
+
+def _number(value):
+    """Numeric value of a field (times are stored as strings like "12")"""
+    if isinstance(value, str):
+        return float(value) if '.' in value else int(value)
+    return value
+
+
+class Recipe:
+    """Compact, slotted record of a recipe's listing and numeric fields"""
+
+    __slots__ = ('slug', 'title', 'category', 'image') + COLUMN_FIELDS
+
+    def __init__(self, recipe):
+        self.slug = recipe['slug']
+        self.title = recipe['title']
+        self.category = recipe['category']
+        self.image = recipe['image']
+        for field in COLUMN_FIELDS:
+            setattr(self, field, _number(recipe[field]))
+
+
+class Columns:
+    """Column-oriented view of the numeric fields, one array per field
+
+    Aggregates run over the packed arrays instead of chasing recipe dicts.
+    Integer-only fields use an integer array so results format like the source.
+    """
+
+    def __init__(self, recipes):
+        self.slugs = [r['slug'] for r in recipes]
+        self.index = {slug: i for i, slug in enumerate(self.slugs)}
+        self.data = {}
+        for field in COLUMN_FIELDS:
+            values = [_number(r[field]) for r in recipes]
+            typecode = 'q' if all(isinstance(v, int) for v in values) else 'd'
+            self.data[field] = array(typecode, values)
+
+    def __len__(self):
+        return len(self.slugs)
+
+    def _positions(self, slugs):
+        if slugs is None:
+            return range(len(self.slugs))
+        return [self.index[s] for s in slugs if s in self.index]
+
+    def values(self, field, slugs=None):
+        """Values of a field for the given slugs (default: whole catalog)"""
+        column = self.data[field]
+        if slugs is None:
+            return column
+        return array(column.typecode, [column[i] for i in self._positions(slugs)])
+
+    def total(self, field, slugs=None):
+        return sum(self.values(field, slugs))
+
+    def mean(self, field, slugs=None):
+        values = self.values(field, slugs)
+        return sum(values) / len(values) if values else 0
+
+
+class Catalog:
+    """In-memory recipe catalog with slug, category, tag and method indexes
+
+    hashes maps each slug to its content hash and card_hashes to the hash of
+    its listing card fields; both are kept in the compiled cache so
+    incremental builds don't re-hash the catalog. changed_slugs lists recipes
+    added, edited or removed since the catalog was last loaded, or is None
+    when there is no previous load to compare against.
+    """
+
+    def __init__(self, recipes, source_hash=None, hashes=None, changed_slugs=None):
+        self.recipes = recipes
+        self.source_hash = source_hash
+        self.hashes = hashes if hashes is not None else {r['slug']: record_hash(r) for r in recipes}
+        self.card_hashes = {r['slug']: card_hash(r) for r in recipes}
+        self.changed_slugs = changed_slugs
+        self.shard_stats = None
+        self._columns = None
+        self._records = None
+        self.by_slug = {}
+        self.by_category = {}
+        self.by_tag = {}
+        self.by_method = {}
+
+        for r in recipes:
+            self.by_slug[r['slug']] = r
+            self.by_category.setdefault(r['category'], []).append(r)
+            for tag in r.get('tags', []):
+                self.by_tag.setdefault(tag, []).append(r)
+            for method in r.get('methods', []):
+                self.by_method.setdefault(method, []).append(r)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def __iter__(self):
+        return iter(self.recipes)
+
+    @property
+    def columns(self):
+        """Columns of the numeric fields, built on first use"""
+        if self._columns is None:
+            self._columns = Columns(self.recipes)
+        return self._columns
+
+    def record(self, slug):
+        """Return the slotted Recipe for this slug, or None"""
+        if self._records is None:
+            self._records = {r['slug']: Recipe(r) for r in self.recipes}
+        return self._records.get(slug)
+
+    def get(self, slug):
+        """Return the recipe with this slug, or None"""
+        return self.by_slug.get(slug)
+
+    def lookup(self, slugs):
+        """Return the recipes for a list of slugs, in order, skipping unknown slugs"""
+        return [self.by_slug[s] for s in slugs if s in self.by_slug]
+
+    def in_category(self, category):
+        return self.by_category.get(category, [])
+
+    def with_tag(self, tag):
+        return self.by_tag.get(tag, [])
+
+    def with_method(self, method):
+        return self.by_method.get(method, [])
+
+    def with_min_protein(self, grams):
+        return [r for r in self.recipes if r['protein'] >= grams]
+
+    def with_max_calories(self, calories):
+        return [r for r in self.recipes if r['calories'] <= calories]
+
+
+class _JSONStream:
+    """Incremental decoder over a text file, reading it one chunk at a time"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays about one chunk long
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError(f'Unexpected end of file in {self.f.name}')
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} at offset {self.pos} in {self.f.name}')
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the chunk (e.g. "1." or "12")
+            # decodes without error, so only accept values followed by a delimiter
+            # (':' after an object key, else the whole file is buffered)
+            if not self.eof and (end == len(self.buf) or self.buf[end] not in ' \t\r\n,:]}') and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_json_recipes(f):
+    """Yield the items of the top-level "recipes" array one at a time"""
+    stream = _JSONStream(f)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == 'recipes':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.pos += 1
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.peek() == ']':
+                        stream.pos += 1
+                        break
+                    stream.expect(',')
+        else:
+            stream.value()
+        if stream.peek() == '}':
+            return
+        stream.expect(',')
+
+
+def iter_recipes(path=RECIPES_PATH):
+    """Yield recipes one at a time from a recipes.json, JSON Lines (.jsonl) or shard directory"""
+    if os.path.isdir(path):
+        for slug in _shard_order(path):
+            with open(_shard_path(path, slug), 'r') as f:
+                yield json.load(f)
+        return
+    with open(path, 'r') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_recipes(f)
+
+
+def file_hash(path):
+    """SHA-256 hex digest of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _shard_path(shard_dir, slug):
+    return os.path.join(shard_dir, f'{slug}.json')
+
+
+def read_manifest(shard_dir):
+    """Return {slug: sha256} in catalog order from a shard manifest, or {}"""
+    try:
+        with open(os.path.join(shard_dir, MANIFEST_NAME), 'r') as f:
+            return {e['slug']: e['sha256'] for e in json.load(f)['recipes']}
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(shard_dir, hashes):
+    """Write the shard manifest and return its content hash"""
+    text = json.dumps({'recipes': [{'slug': s, 'sha256': h} for s, h in hashes.items()]}, indent=2) + '\n'
+    with open(os.path.join(shard_dir, MANIFEST_NAME), 'w') as f:
+        f.write(text)
+    return _sha256(text.encode())
+
+
+def _shard_order(shard_dir):
+    """Shard slugs in manifest order, followed by any new shards by name"""
+    manifest = read_manifest(shard_dir)
+    present = {e.name[:-5] for e in os.scandir(shard_dir)
+               if e.name.endswith('.json') and e.name != MANIFEST_NAME}
+    return [s for s in manifest if s in present] + sorted(present.difference(manifest))
+
+
+def split_catalog(source='data/recipes.json', shard_dir=SHARDS_DIR):
+    """Write one <slug>.json shard per recipe plus the manifest"""
+    os.makedirs(shard_dir, exist_ok=True)
+    hashes = {}
+    for r in iter_recipes(source):
+        data = (json.dumps(r, indent=2) + '\n').encode()
+        with open(_shard_path(shard_dir, r['slug']), 'wb') as f:
+            f.write(data)
+        hashes[r['slug']] = _sha256(data)
+    write_manifest(shard_dir, hashes)
+    return hashes
+
+
+def cache_path(path):
+    return f'{path.rstrip(os.sep)}.cache'
+
+
+def _read_cache(path):
+    """Return the cached (version, source hash) header and Catalog, or (None, None)"""
+    try:
+        with open(cache_path(path), 'rb') as f:
+            key = pickle.load(f)
+            if key[0] != CACHE_VERSION:
+                return None, None
+            return key, pickle.load(f)
+    except (OSError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None, None
+
+
+def _write_cache(path, catalog):
+    tmp = f'{cache_path(path)}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump((CACHE_VERSION, catalog.source_hash), f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(catalog, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path(path))
+    except OSError:
+        # The cache is only an optimization, e.g. the data dir may be read-only
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_catalog(path=RECIPES_PATH, use_cache=True, store=None):
+    """Load and index the recipe catalog, reusing it if already loaded
+
+    The indexed catalog is cached next to the source file as a pickle keyed
+    on the source's SHA-256, so a warm start skips parsing and indexing.
+    With store='sqlite' the catalog is served from the SQLite store instead.
+    """
+    store = store or RECIPE_STORE
+    if store == 'sqlite':
+        from recipe_store import open_store
+        if ('sqlite', path) not in _loaded:
+            _loaded[('sqlite', path)] = open_store(path)
+        return _loaded[('sqlite', path)]
+
+    if path not in _loaded:
+        if os.path.isdir(path):
+            _loaded[path] = _load_shards(path, use_cache)
+        else:
+            _loaded[path] = _load_file(path, use_cache)
+    return _loaded[path]
+
+
+def _changed(old_hashes, new_hashes):
+    return sorted(s for s in old_hashes.keys() | new_hashes.keys()
+                  if old_hashes.get(s) != new_hashes.get(s))
+
+
+def _load_file(path, use_cache):
+    digest = file_hash(path)
+    key, cached = _read_cache(path) if use_cache else (None, None)
+    if cached is not None and key[1] == digest:
+        cached.changed_slugs = []
+        return cached
+
+    catalog = Catalog(list(iter_recipes(path)), digest)
+    if cached is not None:
+        catalog.changed_slugs = _changed(cached.hashes, catalog.hashes)
+    if use_cache:
+        _write_cache(path, catalog)
+    return catalog
+
+
+def _load_shards(shard_dir, use_cache):
+    """Load a shard directory, re-reading only shards whose contents changed
+
+    Shards whose size and mtime match the cache are taken from it unread; the
+    rest are hashed and only parsed if the hash differs from the cached one.
+    """
+    manifest = read_manifest(shard_dir)
+    key, cached = _read_cache(shard_dir) if use_cache else (None, None)
+    old_stats = cached.shard_stats if cached is not None else {}
+    old_hashes = cached.hashes if cached is not None else {}
+
+    records, hashes, stats = {}, {}, {}
+    for slug in _shard_order(shard_dir):
+        shard = _shard_path(shard_dir, slug)
+        st = os.stat(shard)
+        stats[slug] = (st.st_size, st.st_mtime_ns)
+        if old_stats.get(slug) == stats[slug]:
+            hashes[slug] = old_hashes[slug]
+            records[slug] = cached.by_slug[slug]
+            continue
+        with open(shard, 'rb') as f:
+            data = f.read()
+        hashes[slug] = _sha256(data)
+        if old_hashes.get(slug) == hashes[slug]:
+            records[slug] = cached.by_slug[slug]
+        else:
+            records[slug] = json.loads(data)
+
+    if list(hashes.items()) != list(manifest.items()):
+        source_hash = write_manifest(shard_dir, hashes)
+    else:
+        source_hash = file_hash(os.path.join(shard_dir, MANIFEST_NAME))
+
+    catalog = Catalog(list(records.values()), source_hash, hashes)
+    catalog.changed_slugs = _changed(manifest, hashes) if manifest or cached is not None else None
+    catalog.shard_stats = stats
+    if use_cache and (cached is None or stats != old_stats):
+        _write_cache(shard_dir, catalog)
+    return catalog
+
+
+def main():
+    if sys.argv[1:2] == ['split']:
+        source = sys.argv[2] if len(sys.argv) > 2 else 'data/recipes.json'
+        shard_dir = sys.argv[3] if len(sys.argv) > 3 else SHARDS_DIR
+        hashes = split_catalog(source, shard_dir)
+        print(f'Split {len(hashes)} recipes into {shard_dir}/')
+    else:
+        catalog = load_catalog(sys.argv[1] if len(sys.argv) > 1 else RECIPES_PATH)
+        print(f'{len(catalog)} recipes, changed: {catalog.changed_slugs}')
+
+
+if __name__ == '__main__':
+    # Run through the importable module so cached pickles reference catalog.Catalog
+    import catalog
+    catalog.main()
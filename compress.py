@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Precompressed Assets for ProteinCookies.com
+
+Writes .gz and .br siblings next to every text file the site serves to
+visitors (the HTML pages, sitemap.xml, robots.txt and the hashed copies of
+CSS, JS and PDF guides that pages link, see assets.py) at maximum
+compression, so a local server or CDN can serve them without compressing
+on each request.
+
+This is a release target, not part of the default build:
+python build.py compress. Each sibling is a build target keyed by the
+content hash of its source file, so only files whose bytes changed are
+compressed again, and the stage always renders in a process pool.
+Siblings of files that are no longer published, or have dropped below
+MIN_SIZE, are removed after it runs. Brotli needs the brotli package;
+without it only .gz siblings are written.
+"""
+
+from functools import partial
+import glob
+import gzip
+import hashlib
+import os
+
+import assets
+from writer import write_output
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bump when compression settings change so every sibling is rebuilt
+COMPRESS_VERSION = 1
+
+EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.txt', '.svg', '.pdf')
+
+# Published files other than the hashed asset copies recorded in assets.json
+PUBLISHED = ['*.html', 'sitemap.xml', 'robots.txt']
+
+# Directories never searched for stale siblings
+SKIP_DIRS = {'node_modules', 'netlify', 'benchmarks', '__pycache__'}
+
+# Below this a compressed response saves less than its extra headers cost
+MIN_SIZE = 256
+
+
+def compress_gzip(data):
+    # mtime=0 keeps the output byte-identical between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+COMPRESSORS = {'.gz': compress_gzip}
+if brotli is not None:
+    COMPRESSORS['.br'] = compress_brotli
+
+
+def iter_assets():
+    """Yield the path of every published text file worth compressing"""
+    paths = {path for pattern in PUBLISHED for path in glob.glob(pattern)}
+    paths.update(assets.load().values())
+    for path in sorted(paths):
+        if path.endswith(EXTENSIONS) and os.path.isfile(path) and os.path.getsize(path) >= MIN_SIZE:
+            yield path
+
+
+def remove_stale_siblings(root='.'):
+    """Delete .gz/.br files whose source is gone, no longer published or below MIN_SIZE; return their paths"""
+    keep = set(iter_assets())
+    removed = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
+        for file in files:
+            base, suffix = os.path.splitext(file)
+            if suffix in ('.gz', '.br') and base.endswith(EXTENSIONS):
+                path = os.path.normpath(os.path.join(directory, file))
+                if path[:-len(suffix)] not in keep:
+                    os.remove(path)
+                    print(f"Removed stale: {path}")
+                    removed.append(path)
+    return removed
+
+
+def compress_file(path, suffix):
+    with open(path, 'rb') as f:
+        data = f.read()
+    write_output(path + suffix, COMPRESSORS[suffix](data))
+    return path + suffix
+
+
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each compressed sibling"""
+    if brotli is None:
+        print("brotli is not installed; writing .gz siblings only (pip install brotli)")
+    for path in iter_assets():
+        with open(path, 'rb') as f:
+            data = f.read()
+        inputs = {'version': COMPRESS_VERSION, 'content': hashlib.sha256(data).hexdigest()}
+        for suffix in COMPRESSORS:
+            yield path + suffix, inputs, partial(compress_file, path, suffix)
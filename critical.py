@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Critical CSS for ProteinCookies.com
+
+Each generated page type (recipe, category, pack, success) gets the CSS
+for what is above the fold inlined in its <head>; the full stylesheet then
+loads without blocking the first render.
+
+A template marks where its fold is with a {# fold #} comment. The classes
+before it, in the template, the parent layout (up to its own marker) and
+the partials they include, plus the class attributes the page's generator
+writes into the variables rendered before the marker (the header, nav and
+hero), are compiled with the same Tailwind input as the full stylesheet
+(see stylesheet.py) into css/critical/<page>.css. Markup the generator
+builds for the rest of the page is left to the full stylesheet.
+
+Each file is a build target keyed by the classes found above the fold, so
+it is compiled again only when a template change alters them, never per
+page.
+
+Usage:
+    python critical.py
+"""
+
+import ast
+import hashlib
+import os
+import re
+from collections import defaultdict
+from functools import partial
+
+from stylesheet import CONFIG, INPUT_CSS, class_candidates, compile_css, stylesheet_url
+from templating import TEMPLATE_DIR
+from writer import write_output
+
+# Bump to force every critical stylesheet to be rebuilt
+GENERATOR_VERSION = 1
+
+OUTPUT_DIR = 'css/critical'
+
+# The generators named in PAGES sit next to this module
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# page -> (template, generator whose class attributes end up in it, partials rendered above the fold)
+PAGES = {
+    'recipe': ('recipe.html', 'generate_pages.py', []),
+    'category': ('category.html', 'generate_categories.py', ['partials/recipe_card.html']),
+    'pack': ('pack.html', 'generate_packs.py', []),
+    'success': ('success.html', 'generate_success_pages.py', ['partials/pack_item.html']),
+}
+
+FOLD = re.compile(r'\{#\s*fold\b.*?#\}', re.DOTALL)
+INCLUDE = re.compile(r'\{%\s*(include|extends)\s+["\']([^"\']+)["\']\s*%\}')
+VARIABLE = re.compile(r'\{\{\s*(\w+)')
+
+# page -> head markup, read once per build
+_links = {}
+
+
+def output_path(page):
+    return f'{OUTPUT_DIR}/{page}.css'
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def above_fold_source(name):
+    """Source of a template up to its {# fold #} marker, with the parents and partials it names"""
+    source = FOLD.split(_read(os.path.join(TEMPLATE_DIR, name)))[0]
+    parts = [source]
+    for _, included in INCLUDE.findall(source):
+        parts.append(above_fold_source(included))
+    return '\n'.join(parts)
+
+
+def _producers(tree):
+    """Map each name in a module to the expressions that produce it
+
+    Covers assignments, keyword arguments (the values passed to a template)
+    and list appends, wherever they appear in the module.
+    """
+    producers = defaultdict(list)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    producers[target.id].append(node.value)
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)) and isinstance(node.target, ast.Name) and node.value:
+            producers[node.target.id].append(node.value)
+        elif isinstance(node, ast.keyword) and node.arg:
+            producers[node.arg].append(node.value)
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'append'
+              and isinstance(node.func.value, ast.Name)):
+            producers[node.func.value.id].extend(node.args)
+    return producers
+
+
+def generator_markup(generator, names):
+    """Source of the generator expressions that produce the named template variables
+
+    Names those expressions use are followed too, so a class string held in
+    a helper variable is included with the markup that interpolates it.
+    """
+    source = _read(os.path.join(SOURCE_DIR, generator))
+    producers = _producers(ast.parse(source))
+    seen = set()
+    pending = list(names)
+    parts = []
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        for node in producers.get(name, []):
+            parts.append(ast.get_source_segment(source, node))
+            pending.extend(n.id for n in ast.walk(node) if isinstance(n, ast.Name))
+    return '\n'.join(parts)
+
+
+def collect_classes(page):
+    """Return the sorted class candidates used above the fold of a page type"""
+    template, generator, partials = PAGES[page]
+    text = above_fold_source(template)
+    text += generator_markup(generator, set(VARIABLE.findall(text)))
+    for name in partials:
+        text += _read(os.path.join(TEMPLATE_DIR, name))
+    return sorted(class_candidates(text))
+
+
+def build_critical(page, classes):
+    css = compile_css(classes)
+    path = output_path(page)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    write_output(path, css)
+    print(f"Generated: {path} ({len(css.encode('utf-8')):,} bytes, {len(classes)} class candidates)")
+    return path
+
+
+def stylesheet_links(page):
+    """Head markup for the stylesheet: critical CSS inline and the full sheet loaded async, or a plain link"""
+    if page not in _links:
+        href = stylesheet_url()
+        path = output_path(page)
+        if os.path.exists(path):
+            _links[page] = (f'    <style>{_read(path).strip()}</style>\n'
+                            f'    <link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                            f'    <noscript><link rel="stylesheet" href="{href}"></noscript>')
+        else:
+            _links[page] = f'    <link rel="stylesheet" href="{href}">'
+    return _links[page]
+
+
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each page type's critical CSS"""
+    shared = {'version': GENERATOR_VERSION, 'input': _read(INPUT_CSS), 'config': _read(CONFIG)}
+    for page in PAGES:
+        classes = collect_classes(page)
+        inputs = dict(shared, classes=hashlib.sha256(' '.join(classes).encode()).hexdigest())
+        yield output_path(page), inputs, partial(build_critical, page, classes)
+
+
+def clear():
+    """Forget the head markup so the next stylesheet_links() rereads the files (used by watch mode)"""
+    _links.clear()
+
+
+def main():
+    for page in PAGES:
+        build_critical(page, collect_classes(page))
+
+
+if __name__ == '__main__':
+    main()
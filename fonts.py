@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Self-hosted Web Fonts for ProteinCookies.com
+
+Subsets the vendored font files in fonts/src/ to the characters the site
+actually uses and writes them as WOFF2 under fonts/, published under
+content-hashed names (see assets.py). Pages get preload hints for the
+fonts needed above the fold and inline @font-face rules with
+font-display: swap, so no third-party origin sits on the critical path.
+
+Anton only sets uppercase headings, so it is cut down to uppercase forms
+plus whatever characters appear in Anton-styled elements.
+
+Needs fontTools and brotli (pip install fonttools brotli) and the OFL
+sources listed in FONTS (Anton-Regular.ttf from Anton, the Inter-*.ttf
+static instances from Inter) in fonts/src/. Until they are vendored, or
+without those packages, pages load the fonts from Google Fonts without
+blocking render.
+
+Usage:
+    python fonts.py
+"""
+
+import glob
+import html
+import io
+import json
+import os
+import re
+from functools import partial
+
+import assets
+from writer import write_output
+
+try:
+    from fontTools import subset
+except ImportError:
+    subset = None
+
+# Bump to force every font to be rebuilt
+GENERATOR_VERSION = 1
+
+SOURCE_DIR = 'fonts/src'
+
+# family, weight, vendored file, whether it is preloaded, whether it only sets uppercase text
+FONTS = [
+    ('Anton', 400, 'Anton-Regular.ttf', True, True),
+    ('Inter', 300, 'Inter-Light.ttf', False, False),
+    ('Inter', 400, 'Inter-Regular.ttf', True, False),
+    ('Inter', 600, 'Inter-SemiBold.ttf', False, False),
+    ('Inter', 700, 'Inter-Bold.ttf', False, False),
+]
+
+GOOGLE_FONTS_URL = 'https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap'
+
+# What pages load while the fonts are not self-hosted: the stylesheet is
+# fetched without blocking render and applied once it arrives
+GOOGLE_FONTS = f'''    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link rel="preload" href="{GOOGLE_FONTS_URL}" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link href="{GOOGLE_FONTS_URL}" rel="stylesheet"></noscript>'''
+
+# Where the site's text comes from: pages and templates, recipe data and generator strings
+TEXT_SOURCES = ['*.html', 'templates/*.html', 'templates/partials/*.html', 'data/*.json', 'generate_*.py']
+
+ANTON_ELEMENT = re.compile(r'class="[^"]*\b(?:anton-text|font-anton)\b[^"]*"[^>]*>([^<]*)')
+
+ASCII = {chr(c) for c in range(0x20, 0x7f)}
+
+
+def output_path(family, weight):
+    return f'fonts/{family.lower()}-{weight}.woff2'
+
+
+def _source(file):
+    return f'{SOURCE_DIR}/{file}'
+
+
+def self_hosted():
+    """True when fontTools is available and every font file is vendored"""
+    return subset is not None and all(os.path.exists(_source(file)) for _, _, file, _, _ in FONTS)
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    if path.endswith('.json'):
+        # Decode \u escapes so the real characters are counted
+        text = json.dumps(json.loads(text), ensure_ascii=False)
+    return html.unescape(text)
+
+
+def collect_characters():
+    """Return (all characters, characters set in Anton) used across the site"""
+    characters = set(ASCII)
+    anton = set()
+    for pattern in TEXT_SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            text = _read_text(path)
+            characters.update(text)
+            for heading in ANTON_ELEMENT.findall(text):
+                anton.update(heading)
+    characters = {c for c in characters if c.isprintable()}
+    anton |= {c.upper() for c in characters if len(c.upper()) == 1}
+    return ''.join(sorted(characters)), ''.join(sorted(anton))
+
+
+def subset_font(source, text):
+    """Return WOFF2 bytes of source cut down to the glyphs for text"""
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def build_font(family, weight, file, text):
+    path = output_path(family, weight)
+    data = subset_font(_source(file), text)
+    write_output(path, data)
+    published = assets.publish(path, data)
+    print(f"Generated: {published} ({len(data):,} bytes, {len(text)} characters)")
+    return published
+
+
+def font_links():
+    """Head markup that loads the fonts: preloads and @font-face rules, or Google Fonts as a fallback"""
+    if not self_hosted():
+        return GOOGLE_FONTS
+    lines = []
+    for family, weight, _, preload, _ in FONTS:
+        if preload:
+            lines.append(f'    <link rel="preload" href="{assets.url(output_path(family, weight))}" '
+                         f'as="font" type="font/woff2" crossorigin>')
+    lines.append('    <style>')
+    for family, weight, _, _, _ in FONTS:
+        lines.append(f"        @font-face {{ font-family: '{family}'; font-style: normal; font-weight: {weight}; "
+                     f"font-display: swap; src: url({assets.url(output_path(family, weight))}) format('woff2'); }}")
+    lines.append('    </style>')
+    return '\n'.join(lines)
+
+
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each subset font"""
+    if not self_hosted():
+        print(f"Fonts not vendored in {SOURCE_DIR}/ (or fontTools missing); pages keep using Google Fonts")
+        return
+    characters, anton = collect_characters()
+    for family, weight, file, _, uppercase in FONTS:
+        with open(_source(file), 'rb') as f:
+            source = f.read()
+        text = anton if uppercase else characters
+        inputs = {'version': GENERATOR_VERSION, 'source': assets.fingerprint(file, source), 'text': text}
+        yield output_path(family, weight), inputs, partial(build_font, family, weight, file, text)
+
+
+def main():
+    for filename, inputs, render in targets():
+        render()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Fragment Cache for ProteinCookies.com
+
+Rendered fragments (recipe cards today) keyed by content hash and template
+version, so a card shown on several category and pack pages is rendered
+once per build. The in-memory tier is a small LRU, sized for the cards
+consecutive pages share rather than the whole catalog, so streaming a page
+still holds about one card at a time; set FRAGMENT_CACHE_DIR to also keep
+fragments on disk between builds and share them between build workers.
+Disk entries are grouped by template version, and versions other than the
+current one are pruned.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+from catalog import card_hash
+from templating import get_template
+
+FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR')
+
+# A few pages' worth of cards (48 per category page); the disk tier holds the rest
+MAX_ENTRIES = 256
+MAX_BYTES = 512 * 1024
+
+
+def _size(fragment):
+    return len(fragment.encode('utf-8'))
+
+
+class FragmentCache:
+    """LRU cache of rendered fragments with an optional on-disk tier
+
+    Keys look like 'kind:version:...'; on disk each kind and version gets its
+    own directory so prune() can drop fragments of superseded templates.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+        self.hits = self.disk_hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._current = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        kind, version, _ = key.split(':', 2)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f'{kind}-{version}', digest[:2], f'{digest}.html')
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, fragment):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(fragment)
+        os.replace(tmp, path)
+
+    def _store(self, key, fragment):
+        self._entries[key] = fragment
+        self.size += _size(fragment)
+        while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= _size(evicted)
+
+    def prune(self, kind, version):
+        """Drop fragments of kind rendered by any version but this one, in memory and on disk"""
+        if self._current.get(kind) == version:
+            return
+        self._current[kind] = version
+        prefix = f'{kind}:'
+        current = f'{kind}:{version}:'
+        for key in [k for k in self._entries if k.startswith(prefix) and not k.startswith(current)]:
+            self.size -= _size(self._entries.pop(key))
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.startswith(f'{kind}-') and name != f'{kind}-{version}':
+                # Another build worker may be pruning the same directory
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def get(self, key, render):
+        """Return the fragment for key, calling render() only on a miss in every tier"""
+        fragment = self._entries.get(key)
+        if fragment is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+        if self.directory:
+            fragment = self._read_disk(key)
+            if fragment is not None:
+                self.disk_hits += 1
+                self._store(key, fragment)
+                return fragment
+
+        self.misses += 1
+        fragment = render()
+        self._store(key, fragment)
+        if self.directory:
+            self._write_disk(key, fragment)
+        return fragment
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def summary(self):
+        return f"{self.hits} memory hits, {self.disk_hits} disk hits, {self.misses} rendered"
+
+
+cards = FragmentCache(directory=FRAGMENT_CACHE_DIR)
+
+
+def recipe_card(recipe, content_hash=None, loading='lazy'):
+    """Rendered listing card for a recipe; pass catalog.card_hashes[slug] to skip rehashing
+
+    loading is the image's loading attribute: 'eager' for cards the page
+    shows above the fold, 'lazy' for the rest.
+    """
+    # Looked up per call so watch mode picks up an edited card template
+    template = get_template('partials/recipe_card.html')
+    cards.prune('card', template.source_hash)
+    key = f"card:{template.source_hash}:{loading}:{content_hash or card_hash(recipe)}"
+    return cards.get(key, lambda: template.render(recipe=recipe, loading=loading))
@@ -1,14 +1,39 @@
 #!/usr/bin/env python3
 """
 Generate Category Pages for ProteinCookies.com - Light Theme
+
+Categories longer than CATEGORY_PAGE_SIZE recipes are split into
+category-<slug>.html, category-<slug>-2.html, ... with rel=prev/next links.
 """
 
-import json
+import glob
+import inspect
+import os
+from functools import partial
+
+from bundles import script_tags
+from catalog import load_catalog, record_hash
+from critical import stylesheet_links
+from fonts import font_links
+from fragments import recipe_card
+from templating import get_template
+import writer
+from writer import write_stream
+
+# Bump to force every category page to be rebuilt
+GENERATOR_VERSION = 1
+
+# Recipes per listing page; 0 puts a whole category on one page
+PAGE_SIZE = int(os.environ.get('CATEGORY_PAGE_SIZE', 48))
+
+# Cards in the first grid row (four columns at xl) are above the fold and load eagerly
+ABOVE_FOLD_CARDS = 4
+
+CATEGORY_PAGE = get_template('category.html')
+RECIPE_CARD = get_template('partials/recipe_card.html')
 
 # Load recipes
-with open('data/recipes.json', 'r') as f:
-    data = json.load(f)
-    recipes = data['recipes']
+catalog = load_catalog()
 
 # Define categories
 categories = {
@@ -23,215 +48,169 @@ categories = {
     'seasonal': {'name': 'Seasonal', 'description': 'Holiday and seasonal protein cookie recipes for every occasion.'}
 }
 
+# Category slug -> recipe category name
+CATEGORY_MAP = {
+    'classic': 'Classic',
+    'high-protein': 'High Protein',
+    'dessert': 'Dessert',
+    'quick': 'Quick',
+    'gluten-free': 'Gluten-Free',
+    'vegan': 'Vegan',
+    'kids': 'Kids',
+    'seasonal': 'Seasonal'
+}
+
 def get_category_recipes(cat_slug):
     if cat_slug == 'all':
-        return recipes
-    cat_map = {
-        'classic': 'Classic',
-        'high-protein': 'High Protein',
-        'dessert': 'Dessert',
-        'quick': 'Quick',
-        'gluten-free': 'Gluten-Free',
-        'vegan': 'Vegan',
-        'kids': 'Kids',
-        'seasonal': 'Seasonal'
-    }
-    return [r for r in recipes if r['category'] == cat_map.get(cat_slug, '')]
-
-def generate_category_page(cat_slug, cat_info):
-    cat_recipes = get_category_recipes(cat_slug)
+        return catalog.recipes
+    return catalog.in_category(CATEGORY_MAP.get(cat_slug, ''))
+
+# Category slug -> its recipes in catalog order, split into pages
+_pages = {}
+
+def category_pages(cat_slug):
+    """Pages of a category's recipes, computed once per build
+
+    Pages follow catalog order, so a recipe added at the end of the catalog
+    only changes the last page of each category it joins.
+    """
+    if cat_slug not in _pages:
+        recipes = get_category_recipes(cat_slug)
+        size = PAGE_SIZE or max(len(recipes), 1)
+        _pages[cat_slug] = [recipes[i:i + size] for i in range(0, len(recipes), size)] or [[]]
+    return _pages[cat_slug]
+
+def page_filename(cat_slug, page):
+    return f"category-{cat_slug}.html" if page == 1 else f"category-{cat_slug}-{page}.html"
+
+def pagination(cat_slug, page, has_next):
+    """Return the (head links, pager) markup for a page; both are empty for a single page"""
+    if page == 1 and not has_next:
+        return '', ''
+    links = []
+    pager = []
+    button = 'px-5 py-2.5 rounded-lg bg-slate-100 text-slate-600 hover:bg-slate-200 font-semibold text-sm transition'
+    if page > 1:
+        prev_page = page_filename(cat_slug, page - 1)
+        links.append(f'    <link rel="prev" href="https://proteincookies.com/{prev_page}">\n')
+        pager.append(f'                    <a href="{prev_page}" rel="prev" class="{button}">&larr; Previous</a>\n')
+    else:
+        pager.append('                    <span></span>\n')
+    pager.append(f'                    <span class="text-sm text-slate-500">Page {page}</span>\n')
+    if has_next:
+        next_page = page_filename(cat_slug, page + 1)
+        links.append(f'    <link rel="next" href="https://proteincookies.com/{next_page}">\n')
+        pager.append(f'                    <a href="{next_page}" rel="next" class="{button}">Next &rarr;</a>\n')
+    else:
+        pager.append('                    <span></span>\n')
+    pager = ('                <nav class="flex items-center justify-between mt-12" aria-label="Pagination">\n'
+             + ''.join(pager) + '                </nav>\n')
+    return ''.join(links), pager
+
+def iter_cards(recipes):
+    """Yield recipe cards one at a time, newline-separated; the first row loads eagerly"""
+    for i, r in enumerate(recipes):
+        if i:
+            yield '\n'
+        yield recipe_card(r, catalog.card_hashes[r['slug']], 'eager' if i < ABOVE_FOLD_CARDS else 'lazy')
+
+def generate_category_page(cat_slug, cat_info, page=1):
+    """Return one page of a category as a stream of chunks, one card at a time"""
+    pages = category_pages(cat_slug)
+    cat_recipes = pages[page - 1]
+    has_next = page < len(pages)
     
-    recipes_html = '\n'.join([f'''
-    <a href="{r['slug']}.html" class="group bg-white rounded-2xl overflow-hidden shadow-md hover:shadow-xl transition-all duration-300 border border-slate-100">
-        <div class="relative aspect-square overflow-hidden">
-            <img src="recipe_images/{r['image']}" alt="{r['title']}" class="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500" loading="lazy">
-            <div class="absolute top-3 left-3">
-                <span class="bg-brand-600 text-white text-xs font-bold px-2 py-1 rounded-full shadow">{r['protein']}g</span>
-            </div>
-        </div>
-        <div class="p-4">
-            <h3 class="font-bold text-slate-900 mb-1 line-clamp-1">{r['title']}</h3>
-            <div class="flex items-center gap-3 text-sm text-slate-500">
-                <span>{r['calories']} cal</span>
-                <span>·</span>
-                <span>{r['totalTime']}m</span>
-            </div>
-        </div>
-    </a>''' for r in cat_recipes])
+    cards = iter_cards(cat_recipes)
+    page_links, pager = pagination(cat_slug, page, has_next)
+    if page_links:
+        # Totals are left off paginated pages so appending a recipe doesn't touch every page
+        first = (page - 1) * PAGE_SIZE + 1
+        count_label = f"Recipes {first}–{first + len(cat_recipes) - 1}"
+    else:
+        count_label = f"{len(cat_recipes)} recipes"
     
     # Category navigation
     cat_nav = '\n'.join([f'''
     <a href="category-{slug}.html" class="{'bg-brand-600 text-white' if slug == cat_slug else 'bg-slate-100 text-slate-600 hover:bg-slate-200'} px-4 py-2 rounded-lg text-sm font-semibold transition">{info['name']}</a>''' for slug, info in categories.items()])
     
-    html = f'''<!DOCTYPE html>
-<html lang="en" class="scroll-smooth">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{cat_info['name']} | ProteinCookies.com</title>
-    
-    <meta name="description" content="{cat_info['description']}">
-    <meta name="robots" content="index, follow">
-    <link rel="canonical" href="https://proteincookies.com/category-{cat_slug}.html">
-    
-    <meta property="og:type" content="website">
-    <meta property="og:site_name" content="ProteinCookies.com">
-    <meta property="og:title" content="{cat_info['name']} | ProteinCookies.com">
-    <meta property="og:description" content="{cat_info['description']}">
-    <meta property="og:image" content="https://proteincookies.com/images/logo.png">
-    
-    <meta name="theme-color" content="#f59e0b">
-    <link rel="icon" type="image/png" href="/images/favicon.png">
-    
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
-    
-    <script src="https://cdn.tailwindcss.com"></script>
-    
-    <script>
-        tailwind.config = {{
-            theme: {{
-                extend: {{
-                    fontFamily: {{
-                        'anton': ['Anton', 'sans-serif'],
-                        'sans': ['Inter', 'sans-serif'],
-                    }},
-                    colors: {{
-                        brand: {{
-                            50: '#fffbeb',
-                            100: '#fef3c7',
-                            500: '#f59e0b',
-                            600: '#d97706',
-                            900: '#451a03',
-                        }},
-                        accent: {{
-                            500: '#10b981',
-                        }}
-                    }}
-                }}
-            }}
-        }}
-    </script>
-    <style>
-        .anton-text {{ font-family: 'Anton', sans-serif; letter-spacing: 0.05em; }}
-        .glass-nav {{ background: rgba(255, 255, 255, 0.8); backdrop-filter: blur(12px); }}
-    </style>
-</head>
-
-<body class="min-h-screen bg-slate-50 text-slate-900 font-sans">
-    <!-- Navigation -->
-    <nav class="glass-nav fixed top-0 left-0 right-0 z-50 border-b border-slate-200">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="flex justify-between items-center h-20">
-                <a href="/" class="flex items-center space-x-3">
-                    <img src="images/logo.png" alt="ProteinCookies" class="h-12 w-12 rounded-xl shadow-lg">
-                    <span class="anton-text text-2xl text-brand-600">PROTEINCOOKIES</span>
-                </a>
-                <div class="hidden md:flex items-center space-x-8">
-                    <a href="/" class="text-slate-600 hover:text-brand-600 font-semibold text-sm uppercase tracking-wider">Recipes</a>
-                    <a href="category-all.html" class="text-brand-600 font-semibold text-sm uppercase tracking-wider">Categories</a>
-                    <a href="pack-starter.html" class="bg-brand-600 text-white px-5 py-2.5 rounded-full font-bold text-sm hover:bg-brand-900 transition shadow-lg shadow-brand-500/30">STARTER PACK</a>
-                </div>
-            </div>
-        </div>
-    </nav>
-
-    <main class="pt-20">
-        <!-- Header -->
-        <section class="bg-slate-900 py-16">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <span class="inline-block px-4 py-1 bg-brand-600 text-white font-bold text-xs uppercase tracking-widest rounded-full mb-4">CATEGORY</span>
-                <h1 class="anton-text text-4xl lg:text-5xl text-white mb-4">{cat_info['name'].upper()}</h1>
-                <p class="text-slate-300 text-lg max-w-2xl">{cat_info['description']}</p>
-                <p class="text-brand-500 mt-4 font-semibold">{len(cat_recipes)} recipes</p>
-            </div>
-        </section>
-
-        <!-- Category Navigation -->
-        <section class="py-6 bg-white border-b border-slate-200">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <div class="flex flex-wrap gap-3">
-                    {cat_nav}
-                </div>
-            </div>
-        </section>
-
-        <!-- Recipe Grid -->
-        <section class="py-12">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <div class="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-                    {recipes_html}
-                </div>
-            </div>
-        </section>
-
-        <!-- CTA Section -->
-        <section class="bg-brand-600 py-12">
-            <div class="max-w-4xl mx-auto px-4 sm:px-6 lg:px-8 text-center">
-                <h2 class="anton-text text-3xl text-white mb-4">GET THE FREE STARTER PACK</h2>
-                <p class="text-brand-100 mb-8">Download 5 essential protein cookie recipes with printable cards and shopping lists.</p>
-                <a href="pack-starter.html" class="inline-flex items-center gap-2 bg-white text-brand-600 px-8 py-4 rounded-xl font-bold text-lg hover:bg-brand-50 transition">
-                    <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4"></path>
-                    </svg>
-                    DOWNLOAD FREE PDF
-                </a>
-            </div>
-        </section>
-    </main>
-
-    <!-- Footer -->
-    <footer class="bg-slate-900 text-white py-12">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="grid grid-cols-1 md:grid-cols-4 gap-10 mb-8">
-                <div>
-                    <a href="/" class="flex items-center space-x-3 mb-4">
-                        <img src="images/logo.png" alt="ProteinCookies" class="h-10 w-10 rounded-lg">
-                        <span class="anton-text text-xl text-brand-500">PROTEINCOOKIES</span>
-                    </a>
-                    <p class="text-slate-400 text-sm">Macro-verified protein cookie recipes with USDA nutrition data.</p>
-                </div>
-                <div>
-                    <h4 class="font-bold mb-4">Popular</h4>
-                    <ul class="space-y-2 text-sm text-slate-400">
-                        <li><a href="chocolate-chip-protein-cookies.html" class="hover:text-white transition">Chocolate Chip</a></li>
-                        <li><a href="peanut-butter-protein-cookies.html" class="hover:text-white transition">Peanut Butter</a></li>
-                        <li><a href="no-bake-protein-cookies.html" class="hover:text-white transition">No-Bake</a></li>
-                    </ul>
-                </div>
-                <div>
-                    <h4 class="font-bold mb-4">Recipe Packs</h4>
-                    <ul class="space-y-2 text-sm text-slate-400">
-                        <li><a href="pack-starter.html" class="hover:text-white transition">Starter Pack</a></li>
-                        <li><a href="pack-no-bake.html" class="hover:text-white transition">No-Bake Pack</a></li>
-                        <li><a href="pack-high-protein.html" class="hover:text-white transition">High Protein Pack</a></li>
-                    </ul>
-                </div>
-                <div>
-                    <h4 class="font-bold mb-4">Legal</h4>
-                    <ul class="space-y-2 text-sm text-slate-400">
-                        <li><a href="privacy.html" class="hover:text-white transition">Privacy Policy</a></li>
-                        <li><a href="terms.html" class="hover:text-white transition">Terms of Use</a></li>
-                    </ul>
-                </div>
-            </div>
-            <div class="border-t border-slate-800 pt-8 text-center text-slate-500 text-sm">
-                <p>&copy; 2026 ProteinCookies.com. All rights reserved.</p>
-            </div>
-        </div>
-    </footer>
-</body>
-</html>'''
-    
-    return html
-
-# Generate all category pages
-for slug, info in categories.items():
-    filename = f"category-{slug}.html"
-    html = generate_category_page(slug, info)
-    with open(filename, 'w') as f:
-        f.write(html)
+    return CATEGORY_PAGE.stream(
+        filename=page_filename(cat_slug, page),
+        title_suffix=f" - Page {page}" if page > 1 else '',
+        category=cat_info,
+        count_label=count_label,
+        page_links=page_links,
+        cat_nav=cat_nav,
+        cards=cards,
+        pager=pager,
+        stylesheet=stylesheet_links('category'),
+        fonts=font_links(),
+        scripts=script_tags('category')
+    )
+
+
+def write_category_page(cat_slug, cat_info, page=1):
+    filename = page_filename(cat_slug, page)
+    write_stream(filename, generate_category_page(cat_slug, cat_info, page))
     print(f"Generated: {filename}")
+    return filename
+
+
+def remove_stale_pages():
+    """Delete numbered pages left over from when a category had more pages; return their filenames"""
+    removed = []
+    for cat_slug in categories:
+        page_count = len(category_pages(cat_slug))
+        for filename in sorted(glob.glob(f"category-{cat_slug}-*.html")):
+            number = filename[len(f"category-{cat_slug}-"):-len('.html')]
+            if number.isdigit() and int(number) > page_count:
+                os.remove(filename)
+                print(f"Removed: {filename}")
+                removed.append(filename)
+    return removed
+
+
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each category page
+
+    A page depends on the cards it lists, its position and the category nav,
+    so editing a recipe only rebuilds the category pages that show it.
+    """
+    template = record_hash(CATEGORY_PAGE.source_hash + RECIPE_CARD.source_hash
+                           + inspect.getsource(generate_category_page) + inspect.getsource(pagination)
+                           + inspect.getsource(iter_cards) + str(ABOVE_FOLD_CARDS))
+    nav = record_hash({slug: info['name'] for slug, info in categories.items()})
+    stylesheet = stylesheet_links('category')
+    fonts = font_links()
+    scripts = script_tags('category')
+    for slug, info in categories.items():
+        pages = category_pages(slug)
+        for page, page_recipes in enumerate(pages, 1):
+            inputs = {
+                'version': GENERATOR_VERSION,
+                'template': template,
+                'category': info,
+                'nav': nav,
+                'stylesheet': stylesheet,
+                'fonts': fonts,
+                'scripts': scripts,
+                'page': [page, page < len(pages), PAGE_SIZE],
+                'cards': [catalog.card_hashes[r['slug']] for r in page_recipes],
+            }
+            yield page_filename(slug, page), inputs, partial(write_category_page, slug, info, page)
+
+
+def main():
+    """Generate all category pages"""
+    generated_files = []
+    for slug, info in categories.items():
+        for page in range(1, len(category_pages(slug)) + 1):
+            generated_files.append(write_category_page(slug, info, page))
+    remove_stale_pages()
+    
+    print(f"\nTotal: {len(generated_files)} category pages generated")
+    print(writer.summary())
+    return generated_files
+
 
-print(f"\nTotal: {len(categories)} category pages generated")
+if __name__ == '__main__':
+    main()
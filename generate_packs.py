@@ -3,12 +3,26 @@
 Generate Recipe Pack Pages for ProteinCookies.com - Light Theme
 """
 
-import json
+import inspect
+from functools import partial
+
+from bundles import script_tags
+from catalog import load_catalog, record_hash
+from critical import stylesheet_links
+from fonts import font_links
+from fragments import recipe_card
+from templating import get_template
+import writer
+from writer import write_output
+
+# Bump to force every pack page to be rebuilt
+GENERATOR_VERSION = 1
+
+PACK_PAGE = get_template('pack.html')
+RECIPE_CARD = get_template('partials/recipe_card.html')
 
 # Load recipes
-with open('data/recipes.json', 'r') as f:
-    data = json.load(f)
-    recipes = data['recipes']
+catalog = load_catalog()
 
 # Define packs
 packs = {
@@ -63,239 +77,67 @@ packs = {
 }
 
 def get_recipe_by_slug(slug):
-    for r in recipes:
-        if r['slug'] == slug:
-            return r
-    return None
+    return catalog.get(slug)
 
 def generate_pack_page(pack_slug, pack_info):
-    pack_recipes = [get_recipe_by_slug(slug) for slug in pack_info['recipes']]
-    pack_recipes = [r for r in pack_recipes if r is not None]
-    
-    total_protein = sum(r['protein'] for r in pack_recipes)
-    avg_protein = total_protein // len(pack_recipes) if pack_recipes else 0
-    
-    recipes_html = '\n'.join([f'''
-    <a href="{r['slug']}.html" class="group bg-white rounded-2xl overflow-hidden shadow-md hover:shadow-xl transition-all duration-300 border border-slate-100">
-        <div class="relative aspect-square overflow-hidden">
-            <img src="recipe_images/{r['image']}" alt="{r['title']}" class="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500" loading="lazy">
-            <div class="absolute top-3 left-3">
-                <span class="bg-brand-600 text-white text-xs font-bold px-2 py-1 rounded-full shadow">{r['protein']}g</span>
-            </div>
-        </div>
-        <div class="p-4">
-            <h3 class="font-bold text-slate-900 mb-1 line-clamp-1">{r['title']}</h3>
-            <div class="flex items-center gap-3 text-sm text-slate-500">
-                <span>{r['calories']} cal</span>
-                <span>·</span>
-                <span>{r['totalTime']}m</span>
-            </div>
-        </div>
-    </a>''' for r in pack_recipes])
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en" class="scroll-smooth">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{pack_info['name']} | ProteinCookies.com</title>
+    pack_recipes = catalog.lookup(pack_info['recipes'])
     
-    <meta name="description" content="{pack_info['description']}">
-    <meta name="robots" content="index, follow">
-    <link rel="canonical" href="https://proteincookies.com/pack-{pack_slug}.html">
+    slugs = [r['slug'] for r in pack_recipes]
+    avg_protein = catalog.columns.total('protein', slugs) // len(slugs) if slugs else 0
     
-    <meta name="theme-color" content="#f59e0b">
-    <link rel="icon" type="image/png" href="/images/favicon.png">
+    cards = '\n'.join([recipe_card(r, catalog.card_hashes[r['slug']]) for r in pack_recipes])
     
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
+    html = PACK_PAGE.render(
+        slug=pack_slug,
+        pack=pack_info,
+        count=len(pack_recipes),
+        avg_protein=avg_protein,
+        cards=cards,
+        stylesheet=stylesheet_links('pack'),
+        fonts=font_links(),
+        scripts=script_tags('pack')
+    )
     
-    <script src="https://cdn.tailwindcss.com"></script>
-    
-    <script>
-        tailwind.config = {{
-            theme: {{
-                extend: {{
-                    fontFamily: {{
-                        'anton': ['Anton', 'sans-serif'],
-                        'sans': ['Inter', 'sans-serif'],
-                    }},
-                    colors: {{
-                        brand: {{
-                            50: '#fffbeb',
-                            100: '#fef3c7',
-                            500: '#f59e0b',
-                            600: '#d97706',
-                            900: '#451a03',
-                        }},
-                        accent: {{
-                            500: '#10b981',
-                        }}
-                    }}
-                }}
-            }}
-        }}
-    </script>
-    <style>
-        .anton-text {{ font-family: 'Anton', sans-serif; letter-spacing: 0.05em; }}
-        .glass-nav {{ background: rgba(255, 255, 255, 0.8); backdrop-filter: blur(12px); }}
-    </style>
-</head>
-
-<body class="min-h-screen bg-slate-50 text-slate-900 font-sans">
-    <!-- Navigation -->
-    <nav class="glass-nav fixed top-0 left-0 right-0 z-50 border-b border-slate-200">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="flex justify-between items-center h-20">
-                <a href="/" class="flex items-center space-x-3">
-                    <img src="images/logo.png" alt="ProteinCookies" class="h-12 w-12 rounded-xl shadow-lg">
-                    <span class="anton-text text-2xl text-brand-600">PROTEINCOOKIES</span>
-                </a>
-                <div class="hidden md:flex items-center space-x-8">
-                    <a href="/" class="text-slate-600 hover:text-brand-600 font-semibold text-sm uppercase tracking-wider">Recipes</a>
-                    <a href="category-all.html" class="text-slate-600 hover:text-brand-600 font-semibold text-sm uppercase tracking-wider">Categories</a>
-                    <a href="pack-starter.html" class="bg-brand-600 text-white px-5 py-2.5 rounded-full font-bold text-sm hover:bg-brand-900 transition shadow-lg shadow-brand-500/30">STARTER PACK</a>
-                </div>
-            </div>
-        </div>
-    </nav>
+    return html
 
-    <main class="pt-20">
-        <!-- Hero Section -->
-        <section class="bg-slate-900 py-16 lg:py-24">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <div class="max-w-3xl">
-                    <div class="text-6xl mb-6">{pack_info['emoji']}</div>
-                    <span class="inline-block px-4 py-1 bg-brand-600 text-white font-bold text-xs uppercase tracking-widest rounded-full mb-4">FREE RECIPE PACK</span>
-                    <h1 class="anton-text text-4xl lg:text-6xl text-white mb-4">{pack_info['name'].upper()}</h1>
-                    <p class="text-xl text-brand-500 mb-4">{pack_info['tagline']}</p>
-                    <p class="text-slate-300 text-lg mb-8">{pack_info['description']}</p>
-                    
-                    <div class="flex flex-wrap gap-6 mb-10">
-                        <div class="text-center">
-                            <div class="text-3xl font-bold text-brand-500">{len(pack_recipes)}</div>
-                            <div class="text-sm text-slate-400">Recipes</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-3xl font-bold text-white">{avg_protein}g</div>
-                            <div class="text-sm text-slate-400">Avg Protein</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-3xl font-bold text-white">PDF</div>
-                            <div class="text-sm text-slate-400">Format</div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </section>
 
-        <!-- Email Signup -->
-        <section class="bg-brand-600 py-12">
-            <div class="max-w-2xl mx-auto px-4 sm:px-6 lg:px-8 text-center">
-                <h2 class="anton-text text-2xl text-white mb-4">GET YOUR FREE PACK</h2>
-                <p class="text-brand-100 mb-6">Enter your email to download the {pack_info['name']} instantly.</p>
-                <form action="success-{pack_slug}.html" method="GET" class="flex flex-col sm:flex-row gap-4 max-w-md mx-auto">
-                    <input type="email" name="email" placeholder="Enter your email" required
-                        class="flex-1 px-6 py-4 rounded-xl text-slate-900 font-medium focus:outline-none focus:ring-2 focus:ring-white">
-                    <button type="submit" class="bg-slate-900 text-white px-8 py-4 rounded-xl font-bold hover:bg-slate-800 transition flex items-center justify-center gap-2">
-                        <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4"></path>
-                        </svg>
-                        DOWNLOAD
-                    </button>
-                </form>
-            </div>
-        </section>
+def write_pack_page(pack_slug, pack_info):
+    filename = f"pack-{pack_slug}.html"
+    html = generate_pack_page(pack_slug, pack_info)
+    write_output(filename, html)
+    print(f"Generated: {filename}")
+    return filename
 
-        <!-- Included Recipes -->
-        <section class="py-16">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <h2 class="anton-text text-3xl text-slate-900 mb-8">WHAT'S INCLUDED</h2>
-                <div class="grid sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-                    {recipes_html}
-                </div>
-            </div>
-        </section>
 
-        <!-- What You Get -->
-        <section class="py-16 bg-white">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <h2 class="anton-text text-3xl text-slate-900 mb-8 text-center">WHAT YOU GET</h2>
-                <div class="grid md:grid-cols-3 gap-8">
-                    <div class="text-center p-6">
-                        <div class="w-16 h-16 bg-brand-100 rounded-2xl flex items-center justify-center mx-auto mb-4">
-                            <svg class="w-8 h-8 text-brand-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"></path>
-                            </svg>
-                        </div>
-                        <h3 class="font-bold text-slate-900 mb-2">Printable Recipe Cards</h3>
-                        <p class="text-slate-500 text-sm">Beautiful, easy-to-follow recipe cards you can print and keep in your kitchen.</p>
-                    </div>
-                    <div class="text-center p-6">
-                        <div class="w-16 h-16 bg-brand-100 rounded-2xl flex items-center justify-center mx-auto mb-4">
-                            <svg class="w-8 h-8 text-brand-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2m-3 7h3m-3 4h3m-6-4h.01M9 16h.01"></path>
-                            </svg>
-                        </div>
-                        <h3 class="font-bold text-slate-900 mb-2">Shopping List</h3>
-                        <p class="text-slate-500 text-sm">Combined shopping list organized by category for easy grocery trips.</p>
-                    </div>
-                    <div class="text-center p-6">
-                        <div class="w-16 h-16 bg-brand-100 rounded-2xl flex items-center justify-center mx-auto mb-4">
-                            <svg class="w-8 h-8 text-brand-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 19v-6a2 2 0 00-2-2H5a2 2 0 00-2 2v6a2 2 0 002 2h2a2 2 0 002-2zm0 0V9a2 2 0 012-2h2a2 2 0 012 2v10m-6 0a2 2 0 002 2h2a2 2 0 002-2m0 0V5a2 2 0 012-2h2a2 2 0 012 2v14a2 2 0 01-2 2h-2a2 2 0 01-2-2z"></path>
-                            </svg>
-                        </div>
-                        <h3 class="font-bold text-slate-900 mb-2">Nutrition Facts</h3>
-                        <p class="text-slate-500 text-sm">Complete macro breakdown for every recipe, verified with USDA data.</p>
-                    </div>
-                </div>
-            </div>
-        </section>
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each pack page"""
+    template = record_hash(PACK_PAGE.source_hash + RECIPE_CARD.source_hash + inspect.getsource(generate_pack_page))
+    stylesheet = stylesheet_links('pack')
+    fonts = font_links()
+    scripts = script_tags('pack')
+    for slug, info in packs.items():
+        inputs = {
+            'version': GENERATOR_VERSION,
+            'template': template,
+            'pack': info,
+            'stylesheet': stylesheet,
+            'fonts': fonts,
+            'scripts': scripts,
+            'cards': [catalog.card_hashes[r['slug']] for r in catalog.lookup(info['recipes'])],
+        }
+        yield f"pack-{slug}.html", inputs, partial(write_pack_page, slug, info)
 
-        <!-- Other Packs -->
-        <section class="py-16 bg-slate-100">
-            <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-                <h2 class="anton-text text-3xl text-slate-900 mb-8 text-center">MORE RECIPE PACKS</h2>
-                <div class="grid md:grid-cols-3 gap-6">
-                    <a href="pack-starter.html" class="bg-white rounded-2xl p-6 shadow-md hover:shadow-lg transition border border-slate-100">
-                        <div class="text-4xl mb-4">🍪</div>
-                        <h3 class="font-bold text-slate-900 mb-2">Starter Pack</h3>
-                        <p class="text-slate-500 text-sm">5 essential recipes to get started.</p>
-                    </a>
-                    <a href="pack-no-bake.html" class="bg-white rounded-2xl p-6 shadow-md hover:shadow-lg transition border border-slate-100">
-                        <div class="text-4xl mb-4">⚡</div>
-                        <h3 class="font-bold text-slate-900 mb-2">No-Bake Pack</h3>
-                        <p class="text-slate-500 text-sm">Quick recipes, no oven required.</p>
-                    </a>
-                    <a href="pack-high-protein.html" class="bg-white rounded-2xl p-6 shadow-md hover:shadow-lg transition border border-slate-100">
-                        <div class="text-4xl mb-4">💪</div>
-                        <h3 class="font-bold text-slate-900 mb-2">25g+ Muscle Pack</h3>
-                        <p class="text-slate-500 text-sm">Maximum protein for serious gains.</p>
-                    </a>
-                </div>
-            </div>
-        </section>
-    </main>
 
-    <!-- Footer -->
-    <footer class="bg-slate-900 text-white py-8">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 text-center">
-            <p class="text-slate-400 text-sm">&copy; 2026 ProteinCookies.com. All rights reserved.</p>
-        </div>
-    </footer>
-</body>
-</html>'''
+def main():
+    """Generate all pack pages"""
+    generated_files = []
+    for slug, info in packs.items():
+        generated_files.append(write_pack_page(slug, info))
     
-    return html
+    print(f"\nTotal: {len(packs)} pack pages generated")
+    print(writer.summary())
+    return generated_files
 
-# Generate all pack pages
-for slug, info in packs.items():
-    filename = f"pack-{slug}.html"
-    html = generate_pack_page(slug, info)
-    with open(filename, 'w') as f:
-        f.write(html)
-    print(f"Generated: {filename}")
 
-print(f"\nTotal: {len(packs)} pack pages generated")
+if __name__ == '__main__':
+    main()
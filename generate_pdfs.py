@@ -3,18 +3,30 @@
 Generate PDF Recipe Packs for ProteinCookies.com
 """
 
-import json
 from fpdf import FPDF
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import partial
+import inspect
 import os
+import re
 
-# Load recipes
-with open('data/recipes.json', 'r') as f:
-    data = json.load(f)
-    recipes = data['recipes']
+from catalog import load_catalog, record_hash
+import writer
+from writer import write_output
+
+# Bump to force every PDF to be rebuilt
+GENERATOR_VERSION = 1
+
+# Month the pack contents were last revised: printed on the cover and used as
+# the PDF creation date, so the files are byte-identical wherever and whenever
+# they are built. Bump it along with a content revision.
+EDITION = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+# fpdf stamps the time of the run here; the digits are swapped for build_date()
+CREATION_DATE = re.compile(rb'(/CreationDate \(D:)\d{14}')
 
-# Create a lookup by slug
-recipe_lookup = {r['slug']: r for r in recipes}
+# Load recipes
+catalog = load_catalog()
 
 # Define the packs
 PACKS = {
@@ -88,6 +100,14 @@ PACKS = {
     }
 }
 
+def build_date():
+    """Date the packs are stamped with: EDITION, or $SOURCE_DATE_EPOCH"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc)
+    return EDITION
+
+
 class CookiePDF(FPDF):
     def __init__(self, pack_name):
         super().__init__()
@@ -158,7 +178,7 @@ class CookiePDF(FPDF):
         self.set_font('Helvetica', '', 10)
         self.set_text_color(100, 100, 100)
         self.set_xy(0, 270)
-        self.cell(0, 5, f'Generated {datetime.now().strftime("%B %Y")}', 0, 1, 'C')
+        self.cell(0, 5, f'Generated {build_date().strftime("%B %Y")}', 0, 1, 'C')
         self.cell(0, 5, 'proteincookies.com', 0, 1, 'C')
 
     def table_of_contents(self, pack_info):
@@ -171,17 +191,17 @@ class CookiePDF(FPDF):
         self.ln(5)
         
         for i, slug in enumerate(pack_info['recipes'], 1):
-            recipe = recipe_lookup.get(slug)
+            recipe = catalog.record(slug)
             if recipe:
                 self.set_font('Helvetica', 'B', 14)
                 self.set_text_color(30, 30, 30)
                 self.cell(10, 10, f'{i}.', 0, 0)
-                self.cell(0, 10, recipe['title'], 0, 1)
+                self.cell(0, 10, recipe.title, 0, 1)
                 
                 self.set_font('Helvetica', '', 10)
                 self.set_text_color(100, 100, 100)
                 self.set_x(20)
-                self.cell(0, 6, f"{recipe['protein']}g protein | {recipe['calories']} cal | {recipe['totalTime']} min", 0, 1)
+                self.cell(0, 6, f"{recipe.protein}g protein | {recipe.calories} cal | {recipe.totalTime} min", 0, 1)
                 self.ln(3)
         
         self.ln(10)
@@ -322,7 +342,7 @@ class CookiePDF(FPDF):
         # Collect all ingredients
         all_ingredients = []
         for slug in pack_info['recipes']:
-            recipe = recipe_lookup.get(slug)
+            recipe = catalog.get(slug)
             if recipe:
                 all_ingredients.extend(recipe['ingredients'])
         
@@ -461,7 +481,7 @@ def generate_pack_pdf(pack_key, pack_info):
     
     # Recipe pages
     for slug in pack_info['recipes']:
-        recipe = recipe_lookup.get(slug)
+        recipe = catalog.get(slug)
         if recipe:
             pdf.recipe_page(recipe)
     
@@ -478,12 +498,34 @@ def generate_pack_pdf(pack_key, pack_info):
     output_dir = 'guides'
     os.makedirs(output_dir, exist_ok=True)
     filename = f'{output_dir}/proteincookies-{pack_key}-pack.pdf'
-    pdf.output(filename)
+    data = pdf.output(dest='S')
+    # PyFPDF returns a latin-1 str, fpdf2 a bytearray
+    if isinstance(data, str):
+        data = data.encode('latin-1')
+    stamp = build_date().strftime('%Y%m%d%H%M%S').encode()
+    data = CREATION_DATE.sub(lambda match: match.group(1) + stamp, data)
+    write_output(filename, data)
     print(f'Generated: {filename}')
     return filename
 
 
-if __name__ == '__main__':
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each PDF pack"""
+    template = record_hash(inspect.getsource(CookiePDF) + inspect.getsource(generate_pack_pdf))
+    for pack_key, pack_info in PACKS.items():
+        inputs = {
+            'version': GENERATOR_VERSION,
+            'template': template,
+            'pack': pack_info,
+            'recipes': [catalog.hashes[r['slug']] for r in catalog.lookup(pack_info['recipes'])],
+            # The cover page and creation date are stamped with the edition
+            'edition': build_date().strftime('%Y%m%d%H%M%S'),
+        }
+        yield f'guides/proteincookies-{pack_key}-pack.pdf', inputs, partial(generate_pack_pdf, pack_key, pack_info)
+
+
+def main():
+    """Generate all PDF recipe packs"""
     print('Generating PDF Recipe Packs for ProteinCookies.com\n')
     
     generated_files = []
@@ -492,3 +534,9 @@ if __name__ == '__main__':
         generated_files.append(filename)
     
     print(f'\nTotal: {len(generated_files)} PDF packs generated')
+    print(writer.summary())
+    return generated_files
+
+
+if __name__ == '__main__':
+    main()
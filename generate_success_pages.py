@@ -3,6 +3,20 @@
 Generate Success/Download Pages for ProteinCookies.com - Light Theme
 """
 
+import inspect
+from functools import partial
+
+from bundles import script_tags
+from catalog import record_hash
+from critical import stylesheet_links
+from fonts import font_links
+from templating import get_template
+import writer
+from writer import write_output
+
+# Bump to force every success page to be rebuilt
+GENERATOR_VERSION = 1
+
 # Define the packs with their details
 PACKS = {
     'starter': {
@@ -75,135 +89,8 @@ PACKS = {
     },
 }
 
-TEMPLATE = '''<!DOCTYPE html>
-<html lang="en" class="scroll-smooth">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Download Your {title} | ProteinCookies.com</title>
-    
-    <meta name="description" content="Download your {title} with protein cookie recipes.">
-    <meta name="robots" content="noindex, nofollow">
-    
-    <meta name="theme-color" content="#f59e0b">
-    <link rel="icon" type="image/png" href="/images/favicon.png">
-    
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
-    
-    <script src="https://cdn.tailwindcss.com"></script>
-    
-    <script>
-        tailwind.config = {{
-            theme: {{
-                extend: {{
-                    fontFamily: {{
-                        'anton': ['Anton', 'sans-serif'],
-                        'sans': ['Inter', 'sans-serif'],
-                    }},
-                    colors: {{
-                        brand: {{
-                            50: '#fffbeb',
-                            100: '#fef3c7',
-                            500: '#f59e0b',
-                            600: '#d97706',
-                            900: '#451a03',
-                        }},
-                        accent: {{
-                            500: '#10b981',
-                        }}
-                    }}
-                }}
-            }}
-        }}
-    </script>
-    <style>
-        .anton-text {{ font-family: 'Anton', sans-serif; letter-spacing: 0.05em; }}
-        .glass-nav {{ background: rgba(255, 255, 255, 0.8); backdrop-filter: blur(12px); }}
-        @keyframes checkmark {{
-            0% {{ transform: scale(0); opacity: 0; }}
-            50% {{ transform: scale(1.2); }}
-            100% {{ transform: scale(1); opacity: 1; }}
-        }}
-        .animate-checkmark {{ animation: checkmark 0.5s ease-out forwards; }}
-    </style>
-</head>
-
-<body class="min-h-screen bg-slate-50 text-slate-900 font-sans">
-    <nav class="glass-nav fixed top-0 left-0 right-0 z-50 border-b border-slate-200">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="flex justify-between items-center h-20">
-                <a href="/" class="flex items-center space-x-3">
-                    <img src="images/logo.png" alt="ProteinCookies" class="h-12 w-12 rounded-xl shadow-lg">
-                    <span class="anton-text text-2xl text-brand-600">PROTEINCOOKIES</span>
-                </a>
-            </div>
-        </div>
-    </nav>
-
-    <main class="pt-20">
-        <section class="py-20">
-            <div class="max-w-2xl mx-auto px-4 sm:px-6 lg:px-8 text-center">
-                <div class="mb-8">
-                    <div class="w-24 h-24 bg-accent-500/20 rounded-full mx-auto flex items-center justify-center">
-                        <svg class="w-12 h-12 text-accent-500 animate-checkmark" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="3" d="M5 13l4 4L19 7"></path>
-                        </svg>
-                    </div>
-                </div>
-                
-                <span class="inline-block px-4 py-1 bg-accent-500/20 text-accent-500 text-sm font-bold rounded-full mb-4">SUCCESS!</span>
-                
-                <h1 class="anton-text text-4xl lg:text-5xl text-slate-900 mb-4">YOUR {title_upper} IS READY</h1>
-                
-                <p class="text-slate-500 text-lg mb-8">{subtitle}</p>
-                
-                <a href="guides/{pdf}" download class="inline-flex items-center justify-center gap-3 bg-brand-600 text-white px-10 py-4 rounded-xl font-bold text-lg hover:bg-brand-700 transition shadow-lg shadow-brand-500/30 mb-8">
-                    <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4"></path>
-                    </svg>
-                    DOWNLOAD PDF
-                </a>
-                
-                <div class="bg-white border border-slate-200 rounded-2xl p-8 text-left mt-12 shadow-md">
-                    <h2 class="anton-text text-xl text-slate-900 mb-6">WHAT'S INSIDE YOUR PACK</h2>
-                    
-                    <div class="space-y-4">
-{recipe_list}
-                    </div>
-                    
-                    <div class="border-t border-slate-200 mt-6 pt-6">
-                        <p class="text-slate-500 text-sm">Plus: Shopping list, nutrition facts, storage tips, and printable recipe cards!</p>
-                    </div>
-                </div>
-                
-                <div class="mt-12">
-                    <p class="text-slate-500 mb-4">Want more recipes?</p>
-                    <a href="/" class="text-brand-600 font-semibold hover:underline">Browse all 25+ recipes &rarr;</a>
-                </div>
-            </div>
-        </section>
-    </main>
-
-    <footer class="bg-slate-900 text-white py-8">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 text-center">
-            <p class="text-slate-400 text-sm">&copy; 2026 ProteinCookies.com. All rights reserved.</p>
-        </div>
-    </footer>
-</body>
-</html>
-'''
-
-RECIPE_ITEM_TEMPLATE = '''                        <div class="flex items-start gap-3">
-                            <div class="w-6 h-6 bg-brand-100 rounded-full flex items-center justify-center flex-shrink-0 mt-0.5">
-                                <span class="text-brand-600 text-sm font-bold">{num}</span>
-                            </div>
-                            <div>
-                                <p class="text-slate-900 font-semibold">{name}</p>
-                                <p class="text-slate-500 text-sm">{protein}</p>
-                            </div>
-                        </div>'''
+SUCCESS_PAGE = get_template('success.html')
+PACK_ITEM = get_template('partials/pack_item.html')
 
 def generate_success_page(pack_key, pack_info):
     """Generate a success page for a single pack"""
@@ -211,30 +98,45 @@ def generate_success_page(pack_key, pack_info):
     # Build recipe list HTML
     recipe_items = []
     for i, (name, protein) in enumerate(pack_info['recipes'], 1):
-        item = RECIPE_ITEM_TEMPLATE.format(num=i, name=name, protein=protein)
+        item = PACK_ITEM.render(num=i, name=name, protein=protein)
         recipe_items.append(item)
     
     recipe_list = '\n'.join(recipe_items)
     
     # Generate page HTML
-    html = TEMPLATE.format(
+    html = SUCCESS_PAGE.render(
         title=pack_info['title'],
         title_upper=pack_info['title'],
         subtitle=pack_info['subtitle'],
         pdf=pack_info['pdf'],
-        recipe_list=recipe_list
+        recipe_list=recipe_list,
+        stylesheet=stylesheet_links('success'),
+        fonts=font_links(),
+        scripts=script_tags('success')
     )
     
     # Write file
     filename = f'success-{pack_key}.html'
-    with open(filename, 'w') as f:
-        f.write(html)
+    write_output(filename, html)
     
     print(f'Generated: {filename}')
     return filename
 
 
-if __name__ == '__main__':
+def targets():
+    """Incremental build targets: (filename, inputs, render) for each success page"""
+    template = record_hash(SUCCESS_PAGE.source_hash + PACK_ITEM.source_hash + inspect.getsource(generate_success_page))
+    stylesheet = stylesheet_links('success')
+    fonts = font_links()
+    scripts = script_tags('success')
+    for pack_key, pack_info in PACKS.items():
+        inputs = {'version': GENERATOR_VERSION, 'template': template, 'pack': pack_info,
+                  'stylesheet': stylesheet, 'fonts': fonts, 'scripts': scripts}
+        yield f'success-{pack_key}.html', inputs, partial(generate_success_page, pack_key, pack_info)
+
+
+def main():
+    """Generate all success pages"""
     print('Generating Success Pages for ProteinCookies.com (Light Theme)\n')
     
     generated_files = []
@@ -243,3 +145,9 @@ if __name__ == '__main__':
         generated_files.append(filename)
     
     print(f'\nTotal: {len(generated_files)} success pages generated')
+    print(writer.summary())
+    return generated_files
+
+
+if __name__ == '__main__':
+    main()
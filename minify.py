@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+HTML Minifier for ProteinCookies.com
+
+Conservative minification for generated pages:
+- whitespace between tags is collapsed, and dropped next to block-level tags
+- comments are removed (conditional comments are kept)
+- application/ld+json blocks are re-serialised compactly
+- inline scripts lose indentation and blank lines, inline styles are compacted
+- <pre> and <textarea> contents and attribute values are never changed
+
+Minifier works incrementally: feed() accepts chunks of a streamed page
+and returns the minified output for every token that is complete so far.
+
+Usage:
+    python minify.py page.html [...]   # minify files in place
+"""
+
+import json
+import re
+import sys
+
+# Bump when the output changes so minified pages are rebuilt
+MINIFIER_VERSION = 1
+
+RAW_TAGS = ('script', 'style', 'pre', 'textarea')
+
+# Tags next to which whitespace never renders
+BLOCK_TAGS = {
+    '!doctype', 'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style', 'base',
+    'div', 'section', 'nav', 'main', 'header', 'footer', 'article', 'aside', 'form', 'fieldset',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'br',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'figure', 'figcaption', 'picture',
+    'source', 'noscript', 'svg', 'path', 'blockquote', 'option',
+}
+
+COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+RAW_ELEMENT = re.compile(r'<(script|style|pre|textarea)\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>(.*?)</\1\s*>',
+                         re.DOTALL | re.IGNORECASE)
+TAG = re.compile(r'<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
+TAG_NAME = re.compile(r'</?\s*(!?[A-Za-z][\w:-]*)')
+QUOTED = re.compile(r'("[^"]*"|\'[^\']*\')')
+SPACES = re.compile(r'\s+')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def _tag_name(tag):
+    match = TAG_NAME.match(tag)
+    return match.group(1).lower() if match else ''
+
+
+def _minify_tag(tag):
+    """Collapse whitespace between attributes, leaving quoted values alone"""
+    parts = QUOTED.split(tag)
+    for i in range(0, len(parts), 2):
+        parts[i] = SPACES.sub(' ', parts[i])
+    tag = ''.join(parts)
+    return re.sub(r'\s+(/?>)$', r'\1', tag)
+
+
+def minify_css(css):
+    css = CSS_COMMENT.sub('', css)
+    css = SPACES.sub(' ', css).strip()
+    css = CSS_PUNCTUATION.sub(r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}')
+
+
+def _skip_string(js, i):
+    """Index just past the '...' or "..." string starting at i"""
+    quote = js[i]
+    i += 1
+    while i < len(js):
+        if js[i] == '\\':
+            i += 2
+        elif js[i] == quote:
+            return i + 1
+        elif js[i] == '\n':
+            return i
+        else:
+            i += 1
+    return len(js)
+
+
+def _skip_template(js, i):
+    """Index just past the `...` template literal starting at i, ${} expressions included"""
+    i += 1
+    while i < len(js):
+        if js[i] == '\\':
+            i += 2
+        elif js[i] == '`':
+            return i + 1
+        elif js.startswith('${', i):
+            i = _skip_expression(js, i + 2)
+        else:
+            i += 1
+    return len(js)
+
+
+def _skip_expression(js, i):
+    """Index just past the } closing a ${ expression whose body starts at i"""
+    depth = 1
+    while i < len(js):
+        c = js[i]
+        if c in '\'"':
+            i = _skip_string(js, i)
+        elif c == '`':
+            i = _skip_template(js, i)
+        else:
+            depth += {'{': 1, '}': -1}.get(c, 0)
+            i += 1
+            if depth == 0:
+                return i
+    return len(js)
+
+
+def _template_literals(js):
+    """(start, end) of each outermost template literal, skipping strings and comments"""
+    spans = []
+    i = 0
+    while i < len(js):
+        if js[i] in '\'"':
+            i = _skip_string(js, i)
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = len(js) if end == -1 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            i = len(js) if end == -1 else end + 2
+        elif js[i] == '`':
+            end = _skip_template(js, i)
+            spans.append((i, end))
+            i = end
+        else:
+            i += 1
+    return spans
+
+
+def minify_js(js):
+    """Trim indentation and drop blank lines; keeping line breaks keeps semicolon insertion intact
+
+    Template literals are left exactly as written, since their line breaks
+    and indentation are part of the string.
+    """
+    literals = []
+    parts = []
+    last = 0
+    for start, end in _template_literals(js):
+        parts.append(js[last:start] + f'\0{len(literals)}\0')
+        literals.append(js[start:end])
+        last = end
+    parts.append(js[last:])
+    code = ''.join(parts)
+    code = '\n'.join(line.strip() for line in code.strip().splitlines() if line.strip())
+    return re.sub(r'\0(\d+)\0', lambda match: literals[int(match.group(1))], code)
+
+
+def _minify_raw(name, attributes, body):
+    name = name.lower()
+    if name == 'script':
+        if 'application/ld+json' in attributes:
+            try:
+                body = json.dumps(json.loads(body), separators=(',', ':'), ensure_ascii=False)
+            except ValueError:
+                body = body.strip()
+        elif not re.search(r'\bsrc\s*=', attributes):
+            body = minify_js(body)
+    elif name == 'style':
+        body = minify_css(body)
+    return f'<{name}{_minify_tag(attributes) if attributes.strip() else ""}>{body}</{name}>'
+
+
+class Minifier:
+    """Incremental HTML minifier; feed() chunks, then close()"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.previous = '!doctype'
+
+    def _text(self, text, following):
+        if not text.strip():
+            if self.previous in BLOCK_TAGS or following in BLOCK_TAGS:
+                return ''
+            return ' '
+        return SPACES.sub(' ', text)
+
+    def _tokens(self, final):
+        out = []
+        buffer = self.buffer
+        pos = 0
+        while pos < len(buffer):
+            if buffer.startswith('<', pos):
+                if buffer.startswith('<!--', pos):
+                    match = COMMENT.match(buffer, pos)
+                    if not match:
+                        break
+                    comment = match.group()
+                    if comment.startswith('<!--['):
+                        out.append(comment)
+                    pos = match.end()
+                    continue
+                name = _tag_name(buffer[pos:pos + 20])
+                if name in RAW_TAGS and not buffer.startswith('</', pos):
+                    match = RAW_ELEMENT.match(buffer, pos)
+                    if not match:
+                        break
+                    if name in ('pre', 'textarea'):
+                        out.append(match.group())
+                    else:
+                        out.append(_minify_raw(*match.groups()))
+                    self.previous = name
+                    pos = match.end()
+                    continue
+                match = TAG.match(buffer, pos)
+                if not match:
+                    break
+                out.append(_minify_tag(match.group()))
+                self.previous = name
+                pos = match.end()
+            else:
+                end = buffer.find('<', pos)
+                if end == -1:
+                    if not final:
+                        break
+                    end = len(buffer)
+                # The next tag's name decides whether this whitespace matters, so wait for all of it
+                match = TAG_NAME.match(buffer, end)
+                if not final and end < len(buffer) and (match.end() == len(buffer) if match else len(buffer) - end < 20):
+                    break
+                following = match.group(1).lower() if match else ''
+                out.append(self._text(buffer[pos:end], following))
+                pos = end
+        if final and pos < len(buffer):
+            # Unterminated markup: pass it through untouched
+            out.append(buffer[pos:])
+            pos = len(buffer)
+        self.buffer = buffer[pos:]
+        return ''.join(out)
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        return self._tokens(final=False)
+
+    def close(self):
+        return self._tokens(final=True).strip() + '\n'
+
+
+def minify_html(html):
+    minifier = Minifier()
+    return minifier.feed(html) + minifier.close()
+
+
+def minify_stream(chunks):
+    """Minify an iterable of str chunks, yielding output as it becomes final"""
+    minifier = Minifier()
+    for chunk in chunks:
+        output = minifier.feed(chunk)
+        if output:
+            yield output
+    yield minifier.close()
+
+
+if __name__ == '__main__':
+    # writer imports this module, so it is only imported when run as a script
+    from writer import write_output
+
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        minified = minify_html(html)
+        write_output(path, minified)
+        print(f"{path}: {len(html.encode())} -> {len(minified.encode())} bytes")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+SQLite Recipe Store for ProteinCookies.com
+Optional catalog backend with indexed queries for category, pack and protein filters
+
+Usage:
+    python recipe_store.py [data/recipes.json]
+
+or set RECIPE_STORE=sqlite to make the generators read through it.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+from catalog import RECIPES_PATH, Columns, Recipe, card_hash, file_hash, iter_recipes, load_catalog, record_hash
+
+# Bump when the schema changes so existing databases are re-imported
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE recipes (
+    slug TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT,
+    category TEXT,
+    protein INTEGER,
+    calories INTEGER,
+    carbs INTEGER,
+    fat INTEGER,
+    fiber INTEGER,
+    sugar INTEGER,
+    total_time INTEGER,
+    difficulty TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE ingredients (slug TEXT NOT NULL, position INTEGER NOT NULL, text TEXT);
+CREATE TABLE instructions (slug TEXT NOT NULL, position INTEGER NOT NULL, step TEXT, text TEXT);
+CREATE TABLE tags (slug TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE TABLE methods (slug TEXT NOT NULL, method TEXT NOT NULL);
+
+CREATE INDEX recipes_position ON recipes (position);
+CREATE INDEX recipes_category ON recipes (category, position);
+CREATE INDEX recipes_protein ON recipes (protein);
+CREATE INDEX recipes_calories ON recipes (calories);
+CREATE INDEX ingredients_slug ON ingredients (slug, position);
+CREATE INDEX instructions_slug ON instructions (slug, position);
+CREATE INDEX tags_tag ON tags (tag, slug);
+CREATE INDEX methods_method ON methods (method, slug);
+'''
+
+
+def db_path_for(source):
+    return os.path.splitext(source)[0] + '.sqlite'
+
+
+def _stored_key(db_path):
+    """Return the (schema version, source hash) a database was built from"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+        try:
+            rows = dict(conn.execute('SELECT key, value FROM meta'))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return (rows.get('schema_version'), rows.get('source_hash'))
+
+
+def import_catalog(source=RECIPES_PATH, db_path=None):
+    """Import recipes.json (or a shard directory) into the SQLite store unless it is already current"""
+    db_path = db_path or db_path_for(source)
+    if os.path.isdir(source):
+        digest = load_catalog(source, store='json').source_hash
+    else:
+        digest = file_hash(source)
+    if _stored_key(db_path) == (str(SCHEMA_VERSION), digest):
+        return db_path
+
+    # Build into a temp file and swap it in, so readers never see a partial import
+    tmp = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        for position, r in enumerate(iter_recipes(source)):
+            slug = r['slug']
+            conn.execute(
+                'INSERT INTO recipes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (slug, position, r['title'], r['category'], r['protein'], r['calories'],
+                 r['carbs'], r['fat'], r['fiber'], r['sugar'], int(r['totalTime']),
+                 r['difficulty'], json.dumps(r)))
+            conn.executemany('INSERT INTO ingredients VALUES (?, ?, ?)',
+                             [(slug, i, ing) for i, ing in enumerate(r['ingredients'])])
+            conn.executemany('INSERT INTO instructions VALUES (?, ?, ?, ?)',
+                             [(slug, i, s['step'], s['text']) for i, s in enumerate(r['instructions'])])
+            conn.executemany('INSERT INTO tags VALUES (?, ?)', [(slug, t) for t in r.get('tags', [])])
+            conn.executemany('INSERT INTO methods VALUES (?, ?)', [(slug, m) for m in r.get('methods', [])])
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('schema_version', str(SCHEMA_VERSION)),
+            ('source_hash', digest),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    return db_path
+
+
+class SQLiteCatalog:
+    """Read-only recipe catalog answering lookups with indexed queries
+
+    Exposes the same lookups as catalog.Catalog. Each process opens its own
+    read-only connection, so forked build workers can query concurrently.
+    The store keeps no previous hashes, so changed_slugs is always None and
+    generate_pages.py --changed rebuilds every page.
+    """
+
+    def __init__(self, db_path, source_hash=None):
+        self.db_path = db_path
+        self.source_hash = source_hash
+        self.changed_slugs = None
+        self._conn = None
+        self._pid = None
+        self._columns = None
+        self._hashes = None
+        self._card_hashes = None
+
+    def _db(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _select(self, where='', params=(), order='position'):
+        rows = self._db().execute(f'SELECT data FROM recipes {where} ORDER BY {order}', params)
+        return [json.loads(data) for (data,) in rows]
+
+    @property
+    def recipes(self):
+        return self._select()
+
+    def __len__(self):
+        return self._db().execute('SELECT COUNT(*) FROM recipes').fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.recipes)
+
+    @property
+    def columns(self):
+        """Columns of the numeric fields, built on first use"""
+        if self._columns is None:
+            self._columns = Columns(self.recipes)
+        return self._columns
+
+    @property
+    def hashes(self):
+        """slug -> content hash, computed on first use"""
+        if self._hashes is None:
+            self._hashes = {r['slug']: record_hash(r) for r in self.recipes}
+        return self._hashes
+
+    @property
+    def card_hashes(self):
+        """slug -> listing card hash, computed on first use"""
+        if self._card_hashes is None:
+            self._card_hashes = {r['slug']: card_hash(r) for r in self.recipes}
+        return self._card_hashes
+
+    def record(self, slug):
+        """Return a slotted Recipe for this slug, or None"""
+        recipe = self.get(slug)
+        return Recipe(recipe) if recipe else None
+
+    def get(self, slug):
+        """Return the recipe with this slug, or None"""
+        row = self._db().execute('SELECT data FROM recipes WHERE slug = ?', (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lookup(self, slugs):
+        """Return the recipes for a list of slugs, in order, skipping unknown slugs"""
+        placeholders = ', '.join('?' * len(slugs))
+        rows = self._db().execute(f'SELECT slug, data FROM recipes WHERE slug IN ({placeholders})', slugs)
+        found = {slug: json.loads(data) for slug, data in rows}
+        return [found[s] for s in slugs if s in found]
+
+    def in_category(self, category):
+        return self._select('WHERE category = ?', (category,))
+
+    def with_tag(self, tag):
+        return self._select('WHERE slug IN (SELECT slug FROM tags WHERE tag = ?)', (tag,))
+
+    def with_method(self, method):
+        return self._select('WHERE slug IN (SELECT slug FROM methods WHERE method = ?)', (method,))
+
+    def with_min_protein(self, grams):
+        return self._select('WHERE protein >= ?', (grams,))
+
+    def with_max_calories(self, calories):
+        return self._select('WHERE calories <= ?', (calories,))
+
+
+def open_store(source=RECIPES_PATH, db_path=None):
+    """Import the source if needed and return a SQLiteCatalog over it"""
+    db_path = import_catalog(source, db_path)
+    return SQLiteCatalog(db_path, _stored_key(db_path)[1])
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else RECIPES_PATH
+    store = open_store(source)
+    print(f'Imported {len(store)} recipes into {store.db_path}')
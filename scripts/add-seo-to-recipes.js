@@ -7,6 +7,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { writeOutput } = require('./write-output');
 
 // Recipe files to process
 const recipeFiles = [
@@ -104,8 +105,11 @@ function processFile(filename) {
         const seoTags = getSeoTags(filename, title, description, image);
         content = content.replace(descEndPattern, `$1${seoTags}`);
 
-        fs.writeFileSync(filepath, content, 'utf8');
-        console.log(`✅ Updated: ${filename}`);
+        if (writeOutput(filepath, content)) {
+            console.log(`✅ Updated: ${filename}`);
+        } else {
+            console.log(`➖ Unchanged: ${filename}`);
+        }
     } else {
         console.log(`⚠️  Skipped: ${filename} (no meta description found)`);
     }
@@ -6,6 +6,10 @@ Add BreadcrumbList Schema to Recipe and Category Pages
 import os
 import re
 import json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # Configuration
 HTML_DIR = ".."
@@ -130,8 +134,7 @@ def add_breadcrumb_to_file(filepath, filename):
     if '</head>' in content:
         content = content.replace('</head>', f'{script_tag}\n</head>')
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_output(filepath, content)
         
         print(f"  Added breadcrumb schema")
         return True
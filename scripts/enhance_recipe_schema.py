@@ -8,6 +8,10 @@ import os
 import re
 import json
 import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # Configuration
 HTML_DIR = ".."
@@ -94,8 +98,7 @@ def process_file(filepath, filename):
     content, updated = add_rating_to_schema(content, rating_info)
     
     if updated:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_output(filepath, content)
         print(f"  Added aggregateRating: {rating_info['rating']} ({rating_info['count']} reviews)")
         return True
     else:
@@ -6,6 +6,10 @@ Add contextual links to related recipes within the content
 
 import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # Configuration
 HTML_DIR = ".."
@@ -107,8 +111,7 @@ def process_file(filepath, filename):
             print(f"  Added link: '{keyword}' -> {target_url}")
     
     if content != original_content:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_output(filepath, content)
         print(f"  Total links added: {links_added}")
         return True
     else:
@@ -1,5 +1,9 @@
 import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 def replace_logos(directory):
     # Header Pattern: Matches the text logo link in the header
@@ -41,8 +45,7 @@ def replace_logos(directory):
                     new_content = footer_pattern.sub(footer_replacement, new_content)
                 
                 if new_content != content:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
+                    write_output(filepath, new_content)
                     print(f"Updated: {file}")
                     files_modified += 1
                 else:
@@ -1,6 +1,7 @@
 // Script to update pack pages to match pack-30g-protein.html template
 const fs = require('fs');
 const path = require('path');
+const { writeOutput } = require('./write-output');
 
 // Pack configurations with unique content
 const packs = {
@@ -294,7 +295,8 @@ function generatePackPage(config) {
     <meta name="pdf-url" content="${config.pdf}">
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
+    <link rel="preload" href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link href="https://fonts.googleapis.com/css2?family=Anton&family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet"></noscript>
     <script src="https://cdn.tailwindcss.com"></script>
     <script src="js/email-signup.js"></script>
     <script defer src="https://cdn.jsdelivr.net/npm/alpinejs@3.x.x/dist/cdn.min.js"></script>
@@ -519,8 +521,11 @@ function generatePackPage(config) {
 Object.entries(packs).forEach(([filename, config]) => {
     const html = generatePackPage(config);
     const filepath = path.join(__dirname, '..', filename);
-    fs.writeFileSync(filepath, html);
-    console.log(`✅ Generated ${filename}`);
+    if (writeOutput(filepath, html)) {
+        console.log(`✅ Generated ${filename}`);
+    } else {
+        console.log(`➖ Unchanged ${filename}`);
+    }
 });
 
 console.log('\n🎉 All pack pages updated!');
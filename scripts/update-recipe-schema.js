@@ -11,6 +11,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { writeOutput } = require('./write-output');
 
 // Recipe configurations with ingredients and instructions for each recipe
 const recipeConfigs = {
@@ -205,8 +206,11 @@ function updateRecipeSchema(filename) {
         // Replace in content
         content = content.replace(/<script type="application\/ld\+json">[\s\S]*?<\/script>/, newScript);
 
-        fs.writeFileSync(filepath, content, 'utf8');
-        console.log(`✅ Updated: ${filename}`);
+        if (writeOutput(filepath, content)) {
+            console.log(`✅ Updated: ${filename}`);
+        } else {
+            console.log(`➖ Unchanged: ${filename}`);
+        }
 
     } catch (e) {
         console.log(`❌ Error: ${filename} - ${e.message}`);
@@ -7,6 +7,10 @@ This replaces any existing footer with the new SEO-optimized footer.
 import os
 import re
 import glob
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # The new unified footer HTML
 NEW_FOOTER = '''    <!-- Footer -->
@@ -105,8 +109,7 @@ def update_footer_in_file(filepath):
                 break
         
         if updated and content != original_content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_output(filepath, content)
             print(f"✓ Updated: {filepath}")
             return True
         else:
@@ -2,7 +2,7 @@
 """
 HTML Image Optimization Script for ProteinMuffins.com
 - Adds width and height attributes to img tags
-- Adds loading="lazy" to below-the-fold images
+- Adds loading="lazy" to below-the-fold images (pages that already set loading are left to it)
 - Adds descriptive alt text to images missing it
 - Converts img tags to picture elements with WebP support
 """
@@ -10,6 +10,10 @@ HTML Image Optimization Script for ProteinMuffins.com
 import os
 import re
 from pathlib import Path
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # Configuration
 HTML_DIR = ".."
@@ -168,21 +172,22 @@ def process_html_file(filepath):
     
     original_content = content
     
-    # Track if we're in the head/hero section (above fold)
-    # Simple heuristic: first 2 img tags are above fold
+    # Generated pages mark their above-the-fold images themselves (loading="eager",
+    # fetchpriority="high") and lazy-load the rest; only guess for pages that don't:
+    # the first 2 img tags are above fold
+    explicit = re.search(r'<img[^>]+\bloading=', content) is not None
     img_count = [0]
     
     def replace_img(match):
         img_count[0] += 1
-        is_above_fold = img_count[0] <= 2
+        is_above_fold = not explicit and img_count[0] <= 2
         return process_img_tag(match, is_above_fold)
     
     # Process all img tags
     content = re.sub(r'<img[^>]+>', replace_img, content)
     
     if content != original_content:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_output(filepath, content)
         print(f"  Updated {img_count[0]} img tags")
         return True
     else:
@@ -6,6 +6,10 @@ Script to update navigation across all HTML pages to match the canonical navigat
 import os
 import re
 from pathlib import Path
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from writer import write_output
 
 # Canonical navigation for internal pages (not index.html)
 CANONICAL_DESKTOP_NAV = '''<nav class="hidden md:flex space-x-8 items-center">
@@ -111,8 +115,7 @@ def process_file(filepath):
         content = update_navigation(content, is_index)
         
         if content != original_content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_output(filepath, content)
             return True, "Updated"
         else:
             return False, "No changes needed"
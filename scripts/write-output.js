@@ -0,0 +1,41 @@
+/**
+ * Output writer for the Node scripts, the counterpart of writer.py's write_output:
+ * files whose bytes are unchanged are left alone (mtime included), and anything
+ * else is written to a temp file next to the target and renamed over it, so a
+ * crashed run never leaves a half-written page.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+function sameContents(filepath, data) {
+    try {
+        return fs.readFileSync(filepath).equals(data);
+    } catch (e) {
+        return false;
+    }
+}
+
+/** Atomically write a string (UTF-8) or Buffer; return false if the file was already identical */
+function writeOutput(filepath, content) {
+    const data = Buffer.isBuffer(content) ? content : Buffer.from(content, 'utf8');
+    if (sameContents(filepath, data)) {
+        return false;
+    }
+    const tmp = path.join(path.dirname(filepath), `.${path.basename(filepath)}.${process.pid}.tmp`);
+    try {
+        let mode = 0o666 & ~process.umask();
+        try {
+            mode = fs.statSync(filepath).mode & 0o777;
+        } catch (e) {}
+        fs.writeFileSync(tmp, data, { mode });
+        fs.chmodSync(tmp, mode);
+        fs.renameSync(tmp, filepath);
+    } catch (e) {
+        fs.rmSync(tmp, { force: true });
+        throw e;
+    }
+    return true;
+}
+
+module.exports = { writeOutput };
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Build-time Tailwind Stylesheet for ProteinCookies.com
+
+Replaces the in-browser cdn.tailwindcss.com compiler with one static,
+purged and minified stylesheet:
+
+1. Collect every class candidate used by the site: class attributes and
+   class strings (class blocks, classList calls) in the HTML pages,
+   templates, generators, scripts/ rewriters and js/*.js.
+2. Compile css/input.css (which loads tailwind.config.js) with the
+   Tailwind CLI, passing exactly those candidates, so only utilities the
+   site uses end up in the output.
+3. Write css/styles.min.css and a content-hashed copy, and record the
+   hashed name in assets.json for the generators to link.
+
+The Tailwind standalone CLI is found through $TAILWINDCSS, the
+./tailwindcss-linux-x64 binary used by package.json, node_modules or PATH
+(pip install tailwindcss-bin also provides it).
+
+Usage:
+    python stylesheet.py
+"""
+
+import glob
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import assets
+from writer import write_output
+
+# Bump to force the stylesheet to be rebuilt
+GENERATOR_VERSION = 1
+
+STYLESHEET = 'css/styles.min.css'
+INPUT_CSS = 'css/input.css'
+CONFIG = 'tailwind.config.js'
+
+# Files read for class attributes, and scripts whose string literals may all be class strings
+SOURCES = ['*.html', 'templates/*.html', 'templates/partials/*.html', 'generate_*.py', 'scripts/*.py']
+SCRIPT_SOURCES = ['js/*.js']
+
+CLI_CANDIDATES = ['./tailwindcss-linux-x64', './node_modules/.bin/tailwindcss', 'tailwindcss']
+
+CLASS_ATTRIBUTE = re.compile(r'\bclass(?:Name)?\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# Block overrides that fill in part of a class attribute, e.g. {% block nav_cta_class %}
+CLASS_BLOCK = re.compile(r'\{%\s*block\s+\w+_class\s*%\}(.*?)\{%\s*endblock\s*%\}', re.DOTALL)
+# Classes a script sets at runtime: el.classList.add("active", ...)
+CLASS_LIST = re.compile(r'\bclassList\.(?:add|remove|toggle|replace)\(([^)]*)\)')
+STRING = re.compile(r'"([^"]*)"|\'([^\']*)\'')
+# Characters Tailwind class names are made of; quotes and braces never are
+CANDIDATE = re.compile(r'[A-Za-z0-9_:/.\[\]%#!@()*&>+~=-]*[A-Za-z][A-Za-z0-9_:/.\[\]%#!@()*&>+~=-]*')
+
+
+def _files(patterns):
+    return sorted({path for pattern in patterns for path in glob.glob(pattern)})
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def class_candidates(text):
+    """Class candidates in the class attributes, class blocks and classList calls of text"""
+    values = [double or single for double, single in CLASS_ATTRIBUTE.findall(text)]
+    values += CLASS_BLOCK.findall(text)
+    values += [double or single for args in CLASS_LIST.findall(text) for double, single in STRING.findall(args)]
+    return _candidates(values)
+
+
+def _candidates(values):
+    # Unbalanced brackets (from a regex like class="bg-slate-900[^"]*") make Tailwind drop the whole inline list
+    return {candidate for value in values for candidate in CANDIDATE.findall(value)
+            if candidate.count('[') == candidate.count(']') and candidate.count('(') == candidate.count(')')}
+
+
+def collect_classes():
+    """Return the sorted class candidates used across the site's HTML, generators and scripts"""
+    classes = set()
+    for path in _files(SOURCES):
+        classes.update(class_candidates(_read(path)))
+    # Scripts build class names in plain strings (e="px-3 "+...) before assigning them
+    for path in _files(SCRIPT_SOURCES):
+        if not assets.is_fingerprinted(path):
+            classes.update(_candidates(double or single for double, single in STRING.findall(_read(path))))
+    return sorted(classes)
+
+
+def find_cli():
+    """Path of the Tailwind CLI, or None if it is not installed"""
+    for candidate in [os.environ.get('TAILWINDCSS')] + CLI_CANDIDATES:
+        if candidate and (os.path.isfile(candidate) and os.access(candidate, os.X_OK) or shutil.which(candidate)):
+            return shutil.which(candidate) or candidate
+    return None
+
+
+def compile_css(classes):
+    """Compile css/input.css with Tailwind for the given classes and return the minified CSS
+
+    The content globs in tailwind.config.js are ignored, so the output has
+    utilities for exactly the given classes and no others.
+    """
+    cli = find_cli()
+    if cli is None:
+        raise SystemExit("Tailwind CLI not found: set $TAILWINDCSS or pip install tailwindcss-bin")
+
+    # The input sits next to css/input.css so its @config and @import paths resolve the same way
+    directory = os.path.dirname(INPUT_CSS)
+    source = _read(INPUT_CSS) + f'\n@source inline("{" ".join(classes)}");\n'
+    temporary = []
+    try:
+        fd, config = tempfile.mkstemp(dir=directory, prefix='.config.', suffix='.js')
+        temporary.append(config)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(f"module.exports = Object.assign({{}}, require('{os.path.relpath(CONFIG, directory)}'), "
+                    "{content: []});\n")
+        source = source.replace(f'@config "{os.path.relpath(CONFIG, directory)}";',
+                                f'@config "./{os.path.basename(config)}";')
+        fd, path = tempfile.mkstemp(dir=directory, prefix='.input.', suffix='.css')
+        temporary.append(path)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(source)
+        result = subprocess.run([cli, '--input', path, '--output', '-', '--minify'],
+                                capture_output=True, text=True)
+    finally:
+        for path in temporary:
+            os.unlink(path)
+    if result.returncode != 0:
+        raise SystemExit(f"tailwindcss failed:\n{result.stderr}")
+    return result.stdout
+
+
+def build_stylesheet(classes):
+    css = assets.rewrite(compile_css(classes))
+    write_output(STYLESHEET, css)
+    published = assets.publish(STYLESHEET, css)
+    print(f"Generated: {published} ({len(css.encode('utf-8')):,} bytes, {len(classes)} class candidates)")
+    return published
+
+
+def stylesheet_url():
+    """URL the generated pages link the stylesheet under"""
+    return assets.url(STYLESHEET)
+
+
+def targets():
+    """Incremental build target: (filename, inputs, render) for the site stylesheet"""
+    classes = collect_classes()
+    inputs = {
+        'version': GENERATOR_VERSION,
+        'classes': hashlib.sha256(' '.join(classes).encode()).hexdigest(),
+        'input': _read(INPUT_CSS),
+        'config': _read(CONFIG),
+    }
+    yield STYLESHEET, inputs, lambda: build_stylesheet(classes)
+
+
+def main():
+    build_stylesheet(collect_classes())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Template Engine for ProteinCookies.com
+
+A small Jinja-style layer over the files in templates/:
+
+    {{ name }}, {{ recipe.title }}, {{ name|upper }}   variables and filters
+    {% extends "base.html" %}                          layout inheritance
+    {% block content %}...{% endblock %}               overridable blocks
+    {% include "partials/nav.html" %}                  shared partials
+    {# ... #}                                          comments
+
+Values are inserted as-is (no escaping), as the generators always have.
+Like Jinja, a template file's final newline is dropped and so is the
+newline right after a block, extends or comment tag, so those tags can sit
+on their own lines. An include keeps its line break in place of the
+partial's dropped final newline.
+
+Each template is compiled once into a Python function that joins
+precompiled text chunks with its variables. The compiled code is cached in
+templates/.compiled.cache and reused until any template file changes.
+
+Template.stream() yields the same chunks instead of joining them. A plain
+{{ name }} whose value is an iterator (such as a generator of recipe cards)
+is streamed item by item, so large listing pages never exist as one string.
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import re
+from collections.abc import Iterator
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+CACHE_PATH = os.path.join(TEMPLATE_DIR, '.compiled.cache')
+
+# Bump when code generation changes so cached templates are recompiled
+ENGINE_VERSION = 2
+
+TAG = re.compile(r'(\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}\n?)', re.DOTALL)
+VARIABLE = re.compile(r'^[A-Za-z_]\w*(\.\w+)*$')
+
+FILTERS = {
+    'upper': '{}.upper()',
+    'lower': '{}.lower()',
+}
+
+# name -> Template, and the on-disk cache of compiled code
+_templates = {}
+_cache = None
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _stream_value(value):
+    return value if isinstance(value, Iterator) else (str(value),)
+
+
+class Template:
+    """A compiled template; render(**context) returns the page as a str, stream(**context) its chunks"""
+
+    __slots__ = ('name', 'dependencies', 'source_hash', '_render', '_stream')
+
+    def __init__(self, name, code, dependencies):
+        namespace = {'_stream_value': _stream_value}
+        exec(code, namespace)
+        self.name = name
+        self.dependencies = dependencies
+        self.source_hash = _sources_hash(dependencies)
+        self._render = namespace['render']
+        self._stream = namespace['stream']
+
+    def render(self, **context):
+        try:
+            return self._render(context)
+        except KeyError as e:
+            raise TemplateError(f'{self.name}: undefined variable {e}') from None
+
+    def stream(self, **context):
+        try:
+            yield from self._stream(context)
+        except KeyError as e:
+            raise TemplateError(f'{self.name}: undefined variable {e}') from None
+
+
+def _read(name):
+    path = os.path.join(TEMPLATE_DIR, name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except FileNotFoundError:
+        raise TemplateError(f'template not found: {name}') from None
+    return source[:-1] if source.endswith('\n') else source
+
+
+def _sources_hash(names):
+    h = hashlib.sha256()
+    for name in names:
+        h.update(name.encode() + b'\0' + _read(name).encode() + b'\0')
+    return h.hexdigest()
+
+
+def _all_templates():
+    names = []
+    for root, _, files in os.walk(TEMPLATE_DIR):
+        for file in files:
+            if file.endswith('.html'):
+                names.append(os.path.relpath(os.path.join(root, file), TEMPLATE_DIR).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def _tag_argument(tag, name):
+    match = re.match(r'^"([^"]+)"$|^\'([^\']+)\'$', tag)
+    if not match:
+        raise TemplateError(f'{name}: expected a quoted template name in {tag!r}')
+    return match.group(1) or match.group(2)
+
+
+def _parse(name, dependencies):
+    """Parse a template into nodes: str, ('var', expr), ('block', name, nodes), ('extends', parent)"""
+    dependencies.append(name)
+    root = []
+    stack = [(None, root)]
+    trim = False
+    for token in TAG.split(_read(name)):
+        if not token:
+            continue
+        if token.startswith('{#'):
+            trim = False
+            continue
+        if not (token.startswith('{{') or token.startswith('{%')):
+            if trim and token.startswith('\n'):
+                token = token[1:]
+            trim = False
+            if token:
+                stack[-1][1].append(token)
+            continue
+
+        trim = False
+        body = token[2:-2].strip()
+        nodes = stack[-1][1]
+        if token.startswith('{{'):
+            nodes.append(('var', body))
+            continue
+
+        keyword, _, argument = body.partition(' ')
+        argument = argument.strip()
+        if keyword == 'block':
+            block = ('block', argument, [])
+            nodes.append(block)
+            stack.append((argument, block[2]))
+            trim = True
+        elif keyword == 'endblock':
+            if len(stack) == 1:
+                raise TemplateError(f'{name}: endblock without block')
+            stack.pop()
+            trim = True
+        elif keyword == 'extends':
+            if root:
+                raise TemplateError(f'{name}: extends must be the first tag')
+            root.append(('extends', _tag_argument(argument, name)))
+            trim = True
+        elif keyword == 'include':
+            nodes.extend(_parse(_tag_argument(argument, name), dependencies))
+        else:
+            raise TemplateError(f'{name}: unknown tag {token!r}')
+    if len(stack) > 1:
+        raise TemplateError(f'{name}: unclosed block {stack[-1][0]!r}')
+    return root
+
+
+def _blocks(nodes, found):
+    for node in nodes:
+        if isinstance(node, tuple) and node[0] == 'block':
+            found.setdefault(node[1], node[2])
+            _blocks(node[2], found)
+    return found
+
+
+def _resolve(nodes, overrides, dependencies):
+    """Apply layout inheritance and flatten blocks, returning str and ('var', expr) nodes"""
+    if nodes and nodes[0][0:1] == ('extends',):
+        blocks = _blocks(nodes, {})
+        blocks.update(overrides)
+        return _resolve(_parse(nodes[0][1], dependencies), blocks, dependencies)
+
+    flat = []
+    for node in nodes:
+        if isinstance(node, str):
+            flat.append(node)
+        elif node[0] == 'block':
+            flat.extend(_resolve(overrides.get(node[1], node[2]), overrides, dependencies))
+        else:
+            flat.append(node)
+    return flat
+
+
+def _expression(expr, name):
+    value, *filters = [part.strip() for part in expr.split('|')]
+    if not VARIABLE.match(value):
+        raise TemplateError(f'{name}: bad variable {value!r}')
+    head, *keys = value.split('.')
+    code = f'ctx[{head!r}]' + ''.join(f'[{key!r}]' for key in keys)
+    code = f'str({code})'
+    for f in filters:
+        if f not in FILTERS:
+            raise TemplateError(f'{name}: unknown filter {f!r}')
+        code = FILTERS[f].format(code)
+    return code
+
+
+def compile_template(name):
+    """Compile a template to a code object defining render(ctx) and stream(ctx); return (code, dependencies)"""
+    dependencies = []
+    nodes = _resolve(_parse(name, dependencies), {}, dependencies)
+
+    # Merge adjacent text so rendering joins as few chunks as possible
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            if parts and isinstance(parts[-1], str):
+                parts[-1] += node
+            else:
+                parts.append(node)
+        else:
+            parts.append(node)
+
+    lines = ['def render(ctx):', '    return "".join([']
+    for part in parts:
+        lines.append(f'        {part!r},' if isinstance(part, str) else f'        {_expression(part[1], name)},')
+    lines.append('    ])')
+
+    lines += ['', 'def stream(ctx):']
+    for part in parts:
+        if isinstance(part, str):
+            lines.append(f'    yield {part!r}')
+        elif VARIABLE.match(part[1].strip()) and '.' not in part[1]:
+            lines.append(f'    yield from _stream_value(ctx[{part[1].strip()!r}])')
+        else:
+            lines.append(f'    yield {_expression(part[1], name)}')
+    code = compile('\n'.join(lines) + '\n', f'<template {name}>', 'exec')
+    return code, sorted(set(dependencies))
+
+
+def _cache_key():
+    return f'{ENGINE_VERSION}:{importlib.util.MAGIC_NUMBER.hex()}:{_sources_hash(_all_templates())}'
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        key = _cache_key()
+        try:
+            with open(CACHE_PATH, 'rb') as f:
+                cached = marshal.load(f)
+            _cache = cached if cached.get('key') == key else None
+        except (OSError, EOFError, ValueError, TypeError):
+            _cache = None
+        if _cache is None:
+            _cache = {'key': key, 'templates': {}}
+    return _cache
+
+
+def _save_cache():
+    tmp = f'{CACHE_PATH}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            marshal.dump(_cache, f)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        # A read-only checkout still renders; it just compiles every run
+        pass
+
+
+def get_template(name):
+    """Return the compiled Template for a file in templates/"""
+    template = _templates.get(name)
+    if template is None:
+        cache = _load_cache()
+        if name not in cache['templates']:
+            cache['templates'][name] = compile_template(name)
+            _save_cache()
+        code, dependencies = cache['templates'][name]
+        template = _templates[name] = Template(name, code, dependencies)
+    return template
+
+
+def render(name, **context):
+    return get_template(name).render(**context)
+
+
+def clear():
+    """Forget compiled templates so edited files are picked up (used by watch mode)"""
+    global _cache
+    _templates.clear()
+    _cache = None
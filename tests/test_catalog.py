@@ -0,0 +1,52 @@
+"""Tests for the streaming recipes.json reader in catalog.py"""
+
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+
+
+class CountingReader:
+    """Text file stand-in that counts how many characters have been read"""
+
+    def __init__(self, text):
+        self.f = io.StringIO(text)
+        self.name = '<recipes>'
+        self.read_chars = 0
+
+    def read(self, size=-1):
+        chunk = self.f.read(size)
+        self.read_chars += len(chunk)
+        return chunk
+
+
+def synthetic_catalog(count):
+    recipes = [{'slug': f'recipe-{i}', 'protein': i % 40, 'calories': 100 + i % 300,
+                'description': 'x' * 500, 'tags': ['quick', 'vegan'], 'rating': 4.5}
+               for i in range(count)]
+    return {'version': 2, 'recipes': recipes, 'updated': '2026-10-01'}
+
+
+def test_first_record_is_yielded_after_about_one_chunk():
+    text = json.dumps(synthetic_catalog(5000), indent=1)
+    assert len(text) > 20 * catalog.CHUNK_SIZE
+    reader = CountingReader(text)
+    records = catalog._iter_json_recipes(reader)
+    assert next(records)['slug'] == 'recipe-0'
+    assert reader.read_chars <= 2 * catalog.CHUNK_SIZE
+
+
+def test_matches_json_load():
+    data = synthetic_catalog(3000)
+    for text in (json.dumps(data), json.dumps(data, indent=2)):
+        assert list(catalog._iter_json_recipes(CountingReader(text))) == data['recipes']
+
+
+def test_empty_and_missing_recipes():
+    assert list(catalog._iter_json_recipes(CountingReader('{}'))) == []
+    assert list(catalog._iter_json_recipes(CountingReader('{"recipes": []}'))) == []
+    assert list(catalog._iter_json_recipes(CountingReader('{"other": 1}'))) == []
@@ -0,0 +1,41 @@
+"""Tests for the rendered fragment cache in fragments.py"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fragments import FragmentCache
+
+
+def test_size_counts_encoded_bytes():
+    cache = FragmentCache()
+    cache.get('card:v1:a', lambda: 'café – 5g')
+    assert cache.size == len('café – 5g'.encode('utf-8'))
+
+
+def test_evicts_least_recently_used_past_the_byte_cap():
+    cache = FragmentCache(max_bytes=10)
+    cache.get('card:v1:a', lambda: 'aaaa')
+    cache.get('card:v1:b', lambda: 'bbbb')
+    cache.get('card:v1:a', lambda: 'unused')
+    cache.get('card:v1:c', lambda: 'cccc')
+    assert len(cache) == 2
+    assert cache.size == 8
+    assert cache.get('card:v1:a', lambda: 'rendered') == 'aaaa'
+    assert cache.get('card:v1:b', lambda: 'rendered') == 'rendered'
+
+
+def test_prune_drops_superseded_versions_on_disk(tmp_path):
+    cache = FragmentCache(directory=str(tmp_path))
+    cache.prune('card', 'v1')
+    cache.get('card:v1:a', lambda: 'old')
+    cache.prune('card', 'v2')
+    cache.get('card:v2:a', lambda: 'new')
+    assert sorted(os.listdir(tmp_path)) == ['card-v2']
+    assert len(cache) == 1
+
+    # A fresh process only finds the current version on disk
+    cache = FragmentCache(directory=str(tmp_path))
+    assert cache.get('card:v2:a', lambda: 'rendered') == 'new'
+    assert cache.disk_hits == 1
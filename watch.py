@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Watch Mode with Live Reload for ProteinCookies.com
+
+Serves the site locally, watches the recipe data, generators, templates and
+js/ for changes, runs only the build stages the changed files affect (see
+AFFECTS), re-rendering just the pages whose inputs changed, and tells open
+browser tabs to reload.
+
+Usage:
+    python watch.py [--port 8000] [--jobs N]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import importlib
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import assets
+import build
+import bundles
+import catalog
+import critical
+import templating
+
+# Directory -> file patterns that trigger a rebuild or reload
+WATCHED = {
+    '.': ['generate_*.py', 'tailwind.config.js'],
+    'css': ['input.css'],
+    'fonts/src': ['*.ttf', '*.otf'],
+    'data': ['*.json', '*.jsonl'],
+    catalog.SHARDS_DIR: ['*.json'],
+    'templates': ['*.html'],
+    'templates/partials': ['*.html'],
+    'js': ['*.js'],
+}
+
+PAGE_STAGES = ['pages', 'categories', 'packs', 'success']
+
+# (directory, file pattern) -> build stages a change there affects, first match wins.
+# Pages link hashed asset names and inline the critical CSS, so any stage
+# that can change those is followed by the page stages.
+AFFECTS = [
+    ('.', 'generate_pages.py', ['css', 'critical', 'bundles', 'pages']),
+    ('.', 'generate_categories.py', ['css', 'critical', 'bundles', 'categories']),
+    ('.', 'generate_packs.py', ['css', 'critical', 'bundles', 'packs']),
+    ('.', 'generate_success_pages.py', ['css', 'critical', 'bundles', 'success']),
+    ('.', 'generate_pdfs.py', ['pdfs', 'assets'] + PAGE_STAGES),
+    ('.', 'tailwind.config.js', ['css', 'critical'] + PAGE_STAGES),
+    ('css', '*', ['css', 'critical'] + PAGE_STAGES),
+    ('fonts/src', '*', ['fonts'] + PAGE_STAGES),
+    ('data', '*', ['catalog', 'pdfs', 'assets'] + PAGE_STAGES),
+    (catalog.SHARDS_DIR, '*', ['catalog', 'pdfs', 'assets'] + PAGE_STAGES),
+    # fonts.py subsets the fonts to the characters the templates use
+    ('templates', '*', ['fonts', 'css', 'critical', 'bundles'] + PAGE_STAGES),
+    ('templates/partials', '*', ['fonts', 'css', 'critical', 'bundles'] + PAGE_STAGES),
+    # Pages load the scripts as hashed copies and bundles, so edits must be republished
+    ('js', '*', ['assets', 'bundles'] + PAGE_STAGES),
+]
+
+# Wait this long after a change for more events before rebuilding
+DEBOUNCE = 0.05
+
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = ("<script>new EventSource('" + LIVE_RELOAD_PATH + "').onmessage = "
+                      "function () { location.reload(); };</script>")
+
+GENERATORS = ['generate_pages', 'generate_categories', 'generate_packs',
+              'generate_success_pages', 'generate_pdfs']
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct('iIII')
+
+
+def _matches(directory, name):
+    # The shard manifest is rewritten by the catalog loader itself, and the
+    # hashed copies in js/ by the assets stage
+    if name == catalog.MANIFEST_NAME or assets.is_fingerprinted(name):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in WATCHED[directory])
+
+
+def _watched_dirs():
+    return [d for d in WATCHED if os.path.isdir(d)]
+
+
+def affected_stages(changed):
+    """Build stages to run for a set of changed paths, in build order"""
+    names = set()
+    for path in changed:
+        directory, name = os.path.split(os.path.normpath(path))
+        for pattern_dir, pattern, stages in AFFECTS:
+            if os.path.normpath(pattern_dir) == (directory or '.') and fnmatch.fnmatch(name, pattern):
+                names.update(stages)
+                break
+    return [name for name in build.STAGES if name in names]
+
+
+class InotifyWatcher:
+    """Blocks until a watched file changes, using Linux inotify through libc"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init failed')
+        self.dirs = {}
+        for directory in _watched_dirs():
+            wd = libc.inotify_add_watch(self.fd, directory.encode(), IN_MASK)
+            if wd >= 0:
+                self.dirs[wd] = directory
+
+    def wait(self):
+        """Return the set of changed paths once a batch of events settles"""
+        changed = set()
+        timeout = None
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                if changed:
+                    return changed
+                continue
+            data = os.read(self.fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0').decode()
+                offset += EVENT.size + length
+                directory = self.dirs.get(wd)
+                if directory and _matches(directory, name):
+                    changed.add(os.path.join(directory, name))
+            if changed:
+                timeout = DEBOUNCE
+
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: compares mtimes a few times a second"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        for directory in _watched_dirs():
+            for entry in os.scandir(directory):
+                if entry.is_file() and _matches(directory, entry.name):
+                    mtimes[entry.path] = entry.stat().st_mtime_ns
+        return mtimes
+
+    def wait(self):
+        while True:
+            time.sleep(self.interval)
+            mtimes = self._scan()
+            changed = {p for p in mtimes.keys() | self.mtimes.keys()
+                       if mtimes.get(p) != self.mtimes.get(p)}
+            self.mtimes = mtimes
+            if changed:
+                return changed
+
+
+class LiveReload:
+    """Tracks the site version and wakes browsers waiting on the event stream"""
+
+    def __init__(self):
+        self.version = 0
+        self.cond = threading.Condition()
+
+    def bump(self):
+        with self.cond:
+            self.version += 1
+            self.cond.notify_all()
+
+    def wait(self, version, timeout=15):
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Static file handler that injects the live reload script into HTML pages"""
+
+    live_reload = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == LIVE_RELOAD_PATH:
+            return self._event_stream()
+        if path.endswith('/'):
+            path += 'index.html'
+        if path.endswith('.html'):
+            return self._html(path)
+        return super().do_GET()
+
+    def _html(self, path):
+        filename = self.translate_path(path)
+        try:
+            with open(filename, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return self.send_error(404)
+        body = body.replace(b'</body>', LIVE_RELOAD_SCRIPT.encode() + b'</body>', 1)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _event_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        version = self.live_reload.version
+        try:
+            while True:
+                new_version = self.live_reload.wait(version)
+                # Comments keep the connection alive; data events trigger a reload
+                self.wfile.write(b'data: reload\n\n' if new_version != version else b': ping\n\n')
+                self.wfile.flush()
+                version = new_version
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def reload_sources():
+    """Drop the loaded catalog and templates and re-import the generators so edits take effect"""
+    catalog._loaded.clear()
+    templating.clear()
+    assets.clear()
+    critical.clear()
+    bundles.clear()
+    for name in GENERATORS:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+
+def serve(port, live_reload):
+    handler = partial(Handler, directory=os.getcwd())
+    Handler.live_reload = live_reload
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving on http://127.0.0.1:{port}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild and live-reload ProteinCookies.com on change')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='render with N worker processes (0 = one per core)')
+    args = parser.parse_args()
+    jobs = build.worker_count(args.jobs) if args.jobs != 1 else 1
+
+    build.build(jobs=jobs)
+    live_reload = LiveReload()
+    serve(args.port, live_reload)
+
+    try:
+        watcher = InotifyWatcher()
+    except (OSError, AttributeError):
+        watcher = PollingWatcher()
+    print(f"Watching {', '.join(_watched_dirs())} for changes (Ctrl+C to stop)")
+
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            print(f"\nChanged: {', '.join(sorted(changed))}")
+            try:
+                reload_sources()
+                build.build(affected_stages(changed), jobs=jobs, dependencies=False)
+            except Exception as e:
+                print(f"Build failed: {e!r}")
+                continue
+            live_reload.bump()
+            print(f"Reloaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Output Writer for ProteinCookies.com
+Shared by the generators and scripts/ to write generated files safely
+
+Files whose bytes are unchanged are left alone (mtime included), so rsync
+and deploy diffs only see real changes. Everything else is written to a
+temp file next to the target and renamed over it, so a crashed run never
+leaves a half-written page.
+
+References in .html outputs to fingerprinted assets are rewritten to their
+hashed names (see assets.py), and the assets each page referenced are kept
+in references for the build to track. When minify is on (build.py --minify, or
+MINIFY_HTML=1), .html outputs are also minified on their way to disk and
+the bytes saved are reported per page.
+"""
+
+import os
+import tempfile
+import time
+
+import assets
+from minify import minify_html, minify_stream
+
+# Per-process counts (and seconds spent writing) since the last reset_stats()
+stats = {'written': 0, 'unchanged': 0, 'seconds': 0.0, 'minified_saved': 0}
+
+# .html output -> source paths of the fingerprinted assets it references, since the last reset_stats()
+references = {}
+
+minify = os.environ.get('MINIFY_HTML') == '1'
+
+
+def _same_contents(filename, data):
+    try:
+        if os.path.getsize(filename) != len(data):
+            return False
+        with open(filename, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def write_output(filename, content):
+    """Atomically write str (UTF-8) or bytes content; return False if the file was already identical"""
+    start = time.perf_counter()
+    if filename.endswith('.html') and isinstance(content, str):
+        references[filename] = referenced = set()
+        content = assets.rewrite(content, referenced)
+    if minify and filename.endswith('.html') and isinstance(content, str):
+        original = len(content.encode('utf-8'))
+        content = minify_html(content)
+    data = content.encode('utf-8') if isinstance(content, str) else bytes(content)
+    if minify and filename.endswith('.html'):
+        _report(filename, original, len(data))
+    if _same_contents(filename, data):
+        stats['unchanged'] += 1
+        stats['seconds'] += time.perf_counter() - start
+        return False
+
+    fd, tmp = _temp_file(filename)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        _replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    stats['written'] += 1
+    stats['seconds'] += time.perf_counter() - start
+    return True
+
+
+def write_stream(filename, chunks):
+    """Atomically write an iterable of str (UTF-8) or bytes chunks without joining them
+
+    The chunks go straight to the temp file while being compared with the
+    existing file, so memory stays bounded by the largest chunk. Returns
+    False (and leaves the file alone) if the contents were already identical.
+    """
+    start = time.perf_counter()
+    if filename.endswith('.html'):
+        references[filename] = referenced = set()
+        chunks = assets.rewrite_stream(chunks, referenced)
+    minifying = minify and filename.endswith('.html')
+    if minifying:
+        original = [0]
+        chunks = minify_stream(_counted(chunks, original))
+    size = 0
+    try:
+        existing = open(filename, 'rb')
+    except OSError:
+        existing = None
+    same = existing is not None
+
+    fd, tmp = _temp_file(filename)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                f.write(data)
+                size += len(data)
+                if same and existing.read(len(data)) != data:
+                    same = False
+        if minifying:
+            _report(filename, original[0], size)
+        if same and existing.read(1) == b'':
+            os.unlink(tmp)
+            stats['unchanged'] += 1
+            stats['seconds'] += time.perf_counter() - start
+            return False
+        _replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    finally:
+        if existing is not None:
+            existing.close()
+    stats['written'] += 1
+    stats['seconds'] += time.perf_counter() - start
+    return True
+
+
+def _counted(chunks, total):
+    for chunk in chunks:
+        total[0] += len(chunk.encode('utf-8'))
+        yield chunk
+
+
+def _report(filename, original, minified):
+    saved = original - minified
+    stats['minified_saved'] += saved
+    print(f"Minified: {filename} {original:,} -> {minified:,} bytes (-{saved * 100 // max(original, 1)}%)")
+
+
+def _temp_file(filename):
+    directory = os.path.dirname(filename) or '.'
+    return tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(filename)}.', suffix='.tmp')
+
+
+def _replace(tmp, filename):
+    """Give the temp file the target's permissions (or the umask default) and move it into place"""
+    try:
+        mode = os.stat(filename).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp, mode)
+    os.replace(tmp, filename)
+
+
+def reset_stats():
+    stats.update(written=0, unchanged=0, seconds=0.0, minified_saved=0)
+    references.clear()
+
+
+def add_stats(counts):
+    """Merge counts collected elsewhere, e.g. in a build worker process"""
+    for key in stats:
+        stats[key] += counts[key]
+
+
+def summary():
+    text = f"{stats['written']} files changed, {stats['unchanged']} unchanged"
+    if stats['minified_saved']:
+        text += f", {stats['minified_saved']:,} bytes saved by minify"
+    return text